@@ -0,0 +1,88 @@
+# Async versions of the hot endpoints, served instead of the sync ones when ASYNC_DB=1.
+# They reuse the sync query helpers through AsyncSession.run_sync, so the database I/O
+# runs on the aiosqlite driver without tying up a threadpool worker.
+from database import Problem as ProblemModel
+from database import Review as ReviewModel
+from database import get_async_db, get_async_write_db
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+from schemas import Review, ReviewCreate
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.analytics.aggregates import compute_analytics
+from src.analytics.cache import analytics_cache, etag_matches
+from src.analytics.counters import increment_counters
+from src.problems.pool import problem_pool
+from src.problems.registry import UnknownProblemError
+from src.profiling import ProfiledRoute
+from src.scheduling.dispatch import dispatch_scheduler
+from src.scheduling.due_queue import next_due_problems_with_count, set_due_dates
+from src.scheduling.state import record_review
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def replace_sync_routes(app: FastAPI):
+    """
+    Serve these routes on ``app`` in place of its routes with the same path and methods, so
+    each operation is registered, and listed in the OpenAPI schema, only once.
+    """
+    replaced = {(route.path, frozenset(route.methods)) for route in router.routes}
+    app.router.routes = [
+        route for route in app.router.routes
+        if not isinstance(route, APIRoute) or (route.path, frozenset(route.methods)) not in replaced
+    ]
+    app.include_router(router)
+
+
+@router.get("/api/problems/")
+async def read_problems(db: AsyncSession = Depends(get_async_db)):
+    due_problems, due_count = await db.run_sync(next_due_problems_with_count)
+    if len(due_problems) == 0:
+        return {}
+    problem = due_problems[0]
+    logger.info(f'Read problems! - found {due_count}, select {problem.name}')
+    try:
+        problem_data = await problem_pool.aget(problem.name)
+    except UnknownProblemError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    problem_data['id'] = problem.id
+    problem_data['due_count'] = due_count
+    # Tags were loaded with the due query
+    problem_data['tags'] = [t.name for t in problem.tags]
+    return problem_data
+
+
+@router.post("/api/reviews/", response_model=Review)
+async def create_review(review: ReviewCreate, db: AsyncSession = Depends(get_async_write_db)):
+    problem = await db.get(ProblemModel, review.problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    db_review = ReviewModel(problem_id=review.problem_id, correct=review.correct)
+    db.add(db_review)
+    await db.flush()
+    await db.run_sync(lambda session: increment_counters(session, db_review))
+    await db.commit()
+    await db.refresh(db_review)
+
+    try:
+        scheduler = dispatch_scheduler("spaced_repetition")
+        next_review_date = await db.run_sync(lambda session: record_review(session, scheduler, db_review))
+        await db.run_sync(lambda session: set_due_dates(session, {review.problem_id: next_review_date}))
+        logger.info(f'Set due date to {next_review_date}')
+        await db.commit()
+    except Exception as e:
+        logger.error(f'Found {e}')
+    analytics_cache.invalidate()
+    return db_review
+
+
+@router.get("/api/analytics/")
+async def get_analytics(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get comprehensive analytics data for visualization."""
+    payload, etag = await analytics_cache.aget(lambda: db.run_sync(compute_analytics))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(payload, headers={"ETag": etag})
@@ -0,0 +1,172 @@
+"""
+Helpers for benchmarks that drive a real server process over HTTP.
+"""
+import contextlib
+import httpx
+import numpy as np
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from database import Due, Problem, create_db_engine
+from datetime import datetime, timedelta
+from migrations import run_migrations
+from pathlib import Path
+from sqlalchemy.orm import sessionmaker
+from src.analytics.counters import recompute_counters
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def seed_database(path: Path, names: list[str], n_problems: int) -> list[int]:
+    """Create a database at ``path`` holding ``n_problems`` due problems cycling through ``names``."""
+    engine = create_db_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    with sessionmaker(bind=engine)() as db:
+        problems = [Problem(name=names[i % len(names)]) for i in range(n_problems)]
+        db.add_all(problems)
+        db.flush()
+        now = datetime.now()
+        db.add_all([Due(problem_id=p.id, due_date=now - timedelta(days=1 + p.id % 30)) for p in problems])
+        db.commit()
+        problem_ids = [p.id for p in problems]
+    engine.dispose()
+    return problem_ids
+
+
+def seed_review_log(path: Path, names: list[str], n_problems: int, n_reviews: int, seed: int = 0) -> list[int]:
+    """
+    Create a database at ``path`` with ``n_problems`` scheduled problems and ``n_reviews`` reviews.
+
+    Rows are bulk inserted with the driver, so the ORM listeners don't run: the problems' due
+    date mirror is written alongside the due rows and the review counters are recomputed at
+    the end. Scheduler state is left to be backfilled on each problem's next review.
+    """
+    engine = create_db_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    rng = np.random.default_rng(seed)
+    now = np.datetime64(datetime.now().replace(microsecond=0), "us")
+
+    def timestamps(days: np.ndarray) -> list[str]:
+        # SQLAlchemy's SQLite DateTime storage format
+        stamps = now + (days * 86400e6).astype("timedelta64[us]")
+        return np.char.replace(np.datetime_as_string(stamps, unit="us"), "T", " ").tolist()
+
+    problem_ids = list(range(1, n_problems + 1))
+    due_dates = timestamps(rng.uniform(-30, 30, n_problems))
+    created_dates = timestamps(rng.uniform(-400, -365, n_problems))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO problems (id, name, created_date, suspended, due_date, total_reviews, correct_reviews, "
+            "current_streak) VALUES (?, ?, ?, 0, ?, 0, 0, 0)",
+            [(i, names[i % len(names)], created, due)
+             for i, created, due in zip(problem_ids, created_dates, due_dates, strict=True)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO due (problem_id, due_date) VALUES (?, ?)", list(zip(problem_ids, due_dates, strict=True))
+        )
+        chunk = 200_000
+        for start in range(0, n_reviews, chunk):
+            size = min(chunk, n_reviews - start)
+            conn.exec_driver_sql(
+                "INSERT INTO reviews (problem_id, created_date, correct) VALUES (?, ?, ?)",
+                list(zip(
+                    rng.integers(1, n_problems + 1, size).tolist(),
+                    timestamps(rng.uniform(-365, 0, size)),
+                    (rng.random(size) < 0.8).tolist(),
+                    strict=True,
+                )),
+            )
+    with sessionmaker(bind=engine)() as db:
+        recompute_counters(db)
+        db.commit()
+    engine.dispose()
+    return problem_ids
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def run_server(env: dict[str, str], command: list[str] | None = None, timeout: float = 60):
+    """
+    Start the app in a subprocess with ``env`` added to the environment and yield its base URL.
+
+    ``command`` is the launcher to run; it defaults to a single uvicorn process. ``{port}`` is
+    substituted in ``command`` and in the values of ``env``.
+    """
+    port = _free_port()
+    if command is None:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", "{port}", "--log-level", "warning"]
+    command = [part.replace("{port}", str(port)) for part in command]
+    env = {key: value.replace("{port}", str(port)) for key, value in env.items()}
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/api/pool/stats").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError("server did not start")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def load(request, users: int, seconds: float) -> dict:
+    """
+    Call ``request(client)`` from ``users`` threads for ``seconds`` and summarise the latencies.
+
+    ``request`` receives an ``httpx.Client`` and returns the response.
+    """
+    latencies, errors = [], []
+    stop = threading.Event()
+
+    def user():
+        with httpx.Client(timeout=30) as client:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    response = request(client)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                (latencies if ok else errors).append(elapsed)
+
+    threads = [threading.Thread(target=user) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies_ms = np.array(latencies) * 1000
+    if not len(latencies_ms):
+        latencies_ms = np.array([float("nan")])
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
@@ -0,0 +1,40 @@
+"""
+Time distractor generation for typical answers and for the narrow-range worst cases.
+
+    uv run python -m benchmarks.options [--calls 20000]
+"""
+import argparse
+import random
+import time
+from src.problems.utils.options import generate_options
+
+CASES = [
+    ("int", 42, {}),
+    ("int, zero", 0, {}),
+    ("int, range 0, 10 options", 0, {"variation_range": 0, "num_options": 10}),
+    ("boolean", 1, {}),
+    ("float < 1", 0.05, {}),
+    ("float < 10", 3.14, {}),
+    ("float >= 10", 123.45, {}),
+    ("float, range 0, 10 options", 0.5, {"variation_range": 0, "num_options": 10}),
+    ("string", "hello", {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'case':<28} {'us/call':>8}")
+    for label, answer, kwargs in CASES:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            generate_options(answer, rng=rng, **kwargs)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {elapsed / args.calls * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
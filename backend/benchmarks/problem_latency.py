@@ -0,0 +1,45 @@
+"""
+Load-test GET /api/problems/ with generation in the request thread vs in worker processes.
+
+The problem pool is disabled so every request generates its problem. The database only holds
+problems of the CPU-heavy types, so the served problem always goes to the process pool when
+one is configured.
+
+    uv run python -m benchmarks.problem_latency [--workers 0 2 4] [--users 16] [--seconds 10]
+"""
+import argparse
+import tempfile
+from benchmarks.harness import load, run_server, seed_database
+from pathlib import Path
+from src.problems.registry import list_problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4],
+                        help="PROBLEM_PROCESS_WORKERS values to compare (0 = generate in the request thread)")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--problems", type=int, default=500)
+    args = parser.parse_args()
+
+    heavy = [spec.name for spec in list_problems() if spec.cost == "heavy"]
+    print(f"{'workers':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed_database(db_path, heavy, args.problems)
+        for workers in args.workers:
+            env = {
+                "DATABASE_URL": f"sqlite:///{db_path}",
+                "PROBLEM_POOL_LOW_WATERMARK": "0",
+                "PROBLEM_POOL_HIGH_WATERMARK": "0",
+                "PROBLEM_PROCESS_WORKERS": str(workers),
+            }
+            with run_server(env) as base_url:
+                result = load(lambda client: client.get(f"{base_url}/api/problems/"), args.users, args.seconds)
+            print(f"{workers:>8} {result['requests']:>9} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} "
+                  f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare the vectorized batch scheduler with calling the per-problem scheduler in a loop.
+
+    uv run python -m benchmarks.scheduler_batch [--sizes 1000 10000 100000] [--reviews-per-problem 8]
+"""
+import argparse
+import numpy as np
+import time
+from src.scheduling.spaced_repetition import SpacedRepetitionScheduler
+from types import SimpleNamespace
+
+
+def make_review_log(n_problems: int, reviews_per_problem: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_reviews = n_problems * reviews_per_problem
+    problem_ids = np.repeat(np.arange(n_problems), reviews_per_problem)
+    offsets = rng.integers(0, 365 * 24 * 3600, size=n_reviews).astype("timedelta64[s]")
+    created_dates = (np.datetime64("2025-01-01T00:00:00") + offsets).astype("datetime64[us]")
+    correct = rng.random(n_reviews) < 0.8
+    return problem_ids, created_dates, correct
+
+
+def run_loop(scheduler, problem_ids, created_dates, correct):
+    reviews_by_problem = {}
+    for problem_id, created_date, outcome in zip(
+        problem_ids.tolist(), created_dates.tolist(), correct.tolist(), strict=True
+    ):
+        review = SimpleNamespace(created_date=created_date, correct=outcome)
+        reviews_by_problem.setdefault(problem_id, []).append(review)
+    return {problem_id: scheduler.get_next_review_date(reviews) for problem_id, reviews in reviews_by_problem.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--reviews-per-problem", type=int, default=8)
+    args = parser.parse_args()
+
+    scheduler = SpacedRepetitionScheduler()
+    print(f"{'problems':>10} {'reviews':>10} {'loop (s)':>10} {'batch (s)':>10} {'speedup':>8}")
+    for n_problems in args.sizes:
+        columns = make_review_log(n_problems, args.reviews_per_problem)
+
+        start = time.perf_counter()
+        looped = run_loop(scheduler, *columns)
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        problem_ids, next_dates = scheduler.get_next_review_dates_batch(*columns)
+        batch_seconds = time.perf_counter() - start
+
+        for problem_id, next_date in zip(problem_ids[:100].tolist(), next_dates[:100].tolist(), strict=True):
+            assert looped[problem_id] == next_date, f"mismatch for problem {problem_id}"
+
+        print(f"{n_problems:>10} {len(columns[0]):>10} {loop_seconds:>10.3f} {batch_seconds:>10.3f} "
+              f"{loop_seconds / batch_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
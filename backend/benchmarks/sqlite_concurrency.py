@@ -0,0 +1,105 @@
+"""
+Measure read latency while a writer streams review commits, per SQLite connection profile.
+
+    uv run python -m benchmarks.sqlite_concurrency [--profiles default production] [--seconds 5]
+"""
+import argparse
+import numpy as np
+import tempfile
+import threading
+import time
+from database import SQLITE_PRAGMA_PROFILES, Base, Due, Problem, Review, create_db_engine
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from src.scheduling.due_queue import next_due_problems_with_count
+
+
+def seed(session_factory, n_problems: int, reviews_per_problem: int):
+    with session_factory() as db:
+        problems = [Problem(name="bytes2bits") for _ in range(n_problems)]
+        db.add_all(problems)
+        db.flush()
+        now = datetime.now()
+        db.add_all([Due(problem_id=p.id, due_date=now - timedelta(days=p.id % 5)) for p in problems])
+        db.add_all([Review(problem_id=p.id, correct=True, created_date=now - timedelta(days=i))
+                    for p in problems for i in range(reviews_per_problem)])
+        db.commit()
+        return [p.id for p in problems]
+
+
+def writer(session_factory, problem_ids, stop: threading.Event, stats: dict):
+    rng = np.random.default_rng(0)
+    while not stop.is_set():
+        try:
+            with session_factory() as db:
+                db.add(Review(problem_id=int(rng.choice(problem_ids)), correct=bool(rng.random() < 0.8)))
+                db.commit()
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+
+
+def reader(session_factory, stop: threading.Event, latencies: list, stats: dict):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with session_factory() as db:
+                next_due_problems_with_count(db, limit=10)
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            stats["read_errors"] += 1
+
+
+def run_profile(profile: str, seconds: float, readers: int, n_problems: int, reviews_per_problem: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", profile)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        problem_ids = seed(session_factory, n_problems, reviews_per_problem)
+
+        stop = threading.Event()
+        stats = {"writes": 0, "write_errors": 0, "read_errors": 0}
+        latencies = []
+        threads = [threading.Thread(target=writer, args=(session_factory, problem_ids, stop, stats))]
+        threads += [threading.Thread(target=reader, args=(session_factory, stop, latencies, stats))
+                    for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "profile": profile,
+        "reads": len(latencies),
+        "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies) else float("nan"),
+        "p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies) else float("nan"),
+        "max_ms": float(latencies_ms.max()) if len(latencies) else float("nan"),
+        **stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PRAGMA_PROFILES))
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--problems", type=int, default=2000)
+    parser.add_argument("--reviews-per-problem", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'reads':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'writes':>8} {'errors':>8}")
+    for profile in args.profiles:
+        result = run_profile(profile, args.seconds, args.readers, args.problems, args.reviews_per_problem)
+        errors = result["read_errors"] + result["write_errors"]
+        print(f"{profile:>12} {result['reads']:>8} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['max_ms']:>8.2f} {result['writes']:>8} {errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
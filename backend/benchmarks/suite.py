@@ -0,0 +1,248 @@
+"""
+Throughput of the generators, generate_options, the schedulers and the hot API endpoints.
+
+Results are written to JSON, keyed by benchmark name and parameters, along with the commit
+they were measured at. Pass ``--baseline`` with an earlier results file to list what got
+slower; the exit status is 1 when anything regressed by more than ``--threshold``.
+
+The endpoints are called in-process through the ASGI app, against synthetic databases of
+``--sizes`` problems sharing ``--reviews`` reviews between them. The problem pool isn't
+running, so GET /api/problems/ renders its (cheap) problem inline.
+
+    uv run python -m benchmarks.suite [--groups generators options schedulers api]
+        [--sizes 1000 10000 100000] [--reviews 1000000] [--out FILE] [--baseline FILE]
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.harness import BACKEND_DIR, seed_review_log
+from benchmarks.options import CASES
+from datetime import datetime, timedelta
+from loguru import logger
+from pathlib import Path
+from src.problems.registry import get_generator, list_problems
+from src.problems.utils.options import generate_options
+from src.scheduling.dispatch import dispatch_scheduler
+from types import SimpleNamespace
+
+GROUPS = ("generators", "options", "schedulers", "api")
+HISTORY_LENGTHS = (1, 10, 100, 1000)
+
+
+def measure(fn, min_time: float, repeats: int = 5) -> dict:
+    """
+    Time ``fn()`` over ``repeats`` rounds of at least ``min_time / repeats`` seconds each.
+
+    Returns:
+        dict: Per-call seconds (median, min, stdev across rounds) and the median throughput
+    """
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats:
+            break
+        iterations *= 2 if elapsed == 0 else max(2, min(10, int(min_time / repeats / elapsed) + 1))
+    rounds = [elapsed / iterations]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        rounds.append((time.perf_counter() - start) / iterations)
+    median = statistics.median(rounds)
+    return {
+        "iterations": iterations,
+        "repeats": repeats,
+        "median_s": median,
+        "min_s": min(rounds),
+        "stdev_s": statistics.stdev(rounds),
+        "ops_per_s": 1 / median,
+    }
+
+
+def bench_generators(args):
+    for spec in list_problems():
+        generator = get_generator(spec.name)
+        seeds = itertools.count()
+        # A fresh seed per call: this times the generator itself, not the instance cache
+        yield spec.name, {"cost": spec.cost}, lambda g=generator, s=seeds: g.generate_problem(seed=next(s))
+
+
+def bench_options(args):
+    rng = random.Random(0)
+    for label, answer, kwargs in CASES:
+        yield label, {}, lambda a=answer, k=kwargs: generate_options(a, rng=rng, **k)
+
+
+def _review_history(length: int, seed: int = 0) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [SimpleNamespace(created_date=start + timedelta(hours=12 * i), correct=rng.random() < 0.8)
+            for i in range(length)]
+
+
+def bench_schedulers(args):
+    for name in ("simple", "spaced_repetition"):
+        scheduler = dispatch_scheduler(name)
+        for length in HISTORY_LENGTHS:
+            history = _review_history(length)
+            # SimpleScheduler sorts its argument in place, so hand each call a copy
+            yield name, {"history": length}, lambda s=scheduler, h=history: s.get_next_review_date(list(h))
+
+
+def bench_api(args):
+    from database import create_db_engine, get_db, get_write_db
+    from fastapi.testclient import TestClient
+    from main import app
+    from sqlalchemy.orm import sessionmaker
+    from src.analytics.cache import analytics_cache
+
+    names = [spec.name for spec in list_problems() if spec.cost == "cheap"]
+    client = TestClient(app)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_problems in args.sizes:
+            path = Path(tmp) / f"bench-{n_problems}.db"
+            start = time.perf_counter()
+            problem_ids = seed_review_log(path, names, n_problems, args.reviews)
+            elapsed = time.perf_counter() - start
+            logger.warning(f'Seeded {n_problems} problems and {args.reviews} reviews in {elapsed:.1f}s')
+
+            engine = create_db_engine(f"sqlite:///{path}")
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            write_session_factory = sessionmaker(autocommit=False, autoflush=False,
+                                                 bind=engine.execution_options(sqlite_begin="IMMEDIATE"))
+
+            def session(factory):
+                def dependency():
+                    with factory() as db:
+                        yield db
+                return dependency
+
+            app.dependency_overrides[get_db] = session(session_factory)
+            app.dependency_overrides[get_write_db] = session(write_session_factory)
+            # Review a fixed set of problems once up front so the timed reviews fold into
+            # existing scheduler state instead of backfilling it from the history
+            reviewed = rng.sample(problem_ids, min(200, len(problem_ids)))
+            for problem_id in reviewed:
+                client.post("/api/reviews/", json={"problem_id": problem_id, "correct": True})
+
+            def review(reviewed=reviewed):
+                client.post("/api/reviews/", json={"problem_id": rng.choice(reviewed), "correct": rng.random() < 0.8})
+
+            def analytics_cold():
+                analytics_cache.invalidate()
+                client.get("/api/analytics/")
+
+            params = {"problems": n_problems, "reviews": args.reviews}
+            try:
+                yield "read_problems", params, lambda: client.get("/api/problems/")
+                yield "create_review", params, review
+                yield "get_analytics", {**params, "cache": "cold"}, analytics_cold
+                yield "get_analytics", {**params, "cache": "warm"}, lambda: client.get("/api/analytics/")
+            finally:
+                app.dependency_overrides.pop(get_db, None)
+                app.dependency_overrides.pop(get_write_db, None)
+                analytics_cache.invalidate()
+                engine.dispose()
+
+
+BENCHMARKS = {
+    "generators": bench_generators,
+    "options": bench_options,
+    "schedulers": bench_schedulers,
+    "api": bench_api,
+}
+
+
+def _key(result: dict) -> str:
+    return f"{result['group']}/{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+
+def _git_commit() -> str | None:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def compare(baseline: dict, results: list[dict], threshold: float) -> list[str]:
+    """Print throughput changes against ``baseline`` and return the keys that regressed."""
+    old = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst {baseline['meta'].get('commit')}:")
+    print(f"{'benchmark':<72} {'old ops/s':>12} {'new ops/s':>12} {'change':>8}")
+    for result in results:
+        key = _key(result)
+        if key not in old:
+            continue
+        change = result["ops_per_s"] / old[key]["ops_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  slower"
+            regressions.append(key)
+        print(f"{key:<72} {old[key]['ops_per_s']:>12.1f} {result['ops_per_s']:>12.1f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="problems in each synthetic database (api group)")
+    parser.add_argument("--reviews", type=int, default=1_000_000, help="reviews in each synthetic database")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to spend timing each benchmark")
+    parser.add_argument("--out", type=Path, help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="throughput drop against the baseline reported as a regression")
+    args = parser.parse_args()
+
+    # Endpoint logging would dominate the request timings and flood the output
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    meta = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "args": {"groups": args.groups, "sizes": args.sizes, "reviews": args.reviews, "min_time": args.min_time},
+    }
+    results = []
+    print(f"{'benchmark':<72} {'ops/s':>12} {'median us':>12} {'stdev':>7}")
+    for group in args.groups:
+        for name, params, fn in BENCHMARKS[group](args):
+            result = {"group": group, "name": name, "params": params, **measure(fn, args.min_time)}
+            results.append(result)
+            print(f"{_key(result):<72} {result['ops_per_s']:>12.1f} {result['median_s'] * 1e6:>12.1f} "
+                  f"{result['stdev_s'] / result['median_s']:>6.1%}")
+
+    out = args.out or BACKEND_DIR / "benchmarks" / "results" / f"{meta['commit'] or 'unknown'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+    print(f"\nWrote {len(results)} results to {out}")
+
+    if args.baseline is not None:
+        regressions = compare(json.loads(args.baseline.read_text()), results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks more than {args.threshold:.0%} slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Load-test the multi-worker launcher: req/s for reads and review writes at several WEB_CONCURRENCY values.
+
+Each run starts ``python main.py`` against the same seeded database, warms up, then measures
+GET /api/problems/ and POST /api/reviews/ separately. Writes from all workers go through
+SQLite's single write lock, so review throughput is expected to level off while read
+throughput keeps scaling with cores.
+
+    uv run python -m benchmarks.workers [--workers 1 2 4 8] [--users 32] [--seconds 10]
+"""
+import argparse
+import random
+import sys
+import tempfile
+from benchmarks.harness import load, run_server, seed_database
+from pathlib import Path
+from src.problems.registry import list_problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="WEB_CONCURRENCY values to compare")
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--problems", type=int, default=500)
+    args = parser.parse_args()
+
+    names = [spec.name for spec in list_problems() if spec.cost == "cheap"]
+    print(f"{'workers':>8} {'endpoint':>9} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        problem_ids = seed_database(db_path, names, args.problems)
+        for workers in args.workers:
+            env = {
+                "DATABASE_URL": f"sqlite:///{db_path}",
+                "WEB_CONCURRENCY": str(workers),
+                "ANALYTICS_CACHE_EPOCH_PATH": str(Path(tmp) / "analytics-epoch"),
+                "PORT": "{port}",
+            }
+            requests = {
+                "read": lambda client: client.get(f"{base_url}/api/problems/"),
+                "write": lambda client: client.post(
+                    f"{base_url}/api/reviews/",
+                    json={"problem_id": random.choice(problem_ids), "correct": random.random() < 0.8},
+                ),
+            }
+            with run_server(env, command=[sys.executable, "main.py"]) as base_url:
+                for endpoint, request in requests.items():
+                    load(request, args.users, args.warmup)
+                    result = load(request, args.users, args.seconds)
+                    print(f"{workers:>8} {endpoint:>9} {result['requests']:>9} {result['rps']:>8.1f} "
+                          f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
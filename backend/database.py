@@ -1,7 +1,19 @@
 # database.py
 import os
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, create_engine
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    create_engine,
+    event,
+    update,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
@@ -36,12 +48,88 @@ else:
 
 logger.info(f'SQLALCHEMY_DATABASE_URL: {SQLALCHEMY_DATABASE_URL}')
 
+# SQLite connection profiles, applied as PRAGMAs on every new connection.
+# production: WAL so readers don't block behind review commits, NORMAL sync (durable
+# at checkpoints under WAL), a busy timeout instead of immediate "database is locked",
+# 256MB mmap, 64MB page cache and in-memory temp tables.
+SQLITE_PRAGMA_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+}
+# Override with SQLITE_PROFILE; otherwise prd/prod/production envs get the production profile
+SQLITE_PROFILE = (
+    os.getenv("SQLITE_PROFILE")
+    or ("production" if _env in {"prd", "prod", "production"} else "default")
+).lower()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+
+def _apply_sqlite_pragmas(db_engine, sqlite_profile: str):
+    pragmas = SQLITE_PRAGMA_PROFILES[sqlite_profile]
+
+    @event.listens_for(db_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _emit_sqlite_begin(db_engine):
+    # pysqlite only opens a transaction right before the first write, so a read-then-write
+    # transaction must upgrade its lock mid-way and fails with "database is locked" if another
+    # process got there first. Emit BEGIN ourselves so connections with the ``sqlite_begin``
+    # execution option can take the write lock up front with BEGIN IMMEDIATE.
+    @event.listens_for(db_engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(db_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql(f"BEGIN {conn.get_execution_options().get('sqlite_begin', 'DEFERRED')}")
+
+
+def create_db_engine(url: str, sqlite_profile: str = "default"):
+    """Create an engine, applying the named PRAGMA profile on each connection for SQLite URLs."""
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+
+    db_engine = create_engine(url, connect_args={"check_same_thread": False})
+    _apply_sqlite_pragmas(db_engine, sqlite_profile)
+    _emit_sqlite_begin(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(url: str, sqlite_profile: str = "default"):
+    """
+    Create an asyncio engine for the same database. SQLite URLs are switched to the
+    aiosqlite driver, which needs the optional ``async`` extra.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if not url.startswith("sqlite"):
+        return create_async_engine(url)
+
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    _apply_sqlite_pragmas(async_engine.sync_engine, sqlite_profile)
+    _emit_sqlite_begin(async_engine.sync_engine)
+    return async_engine
+
+
+logger.info(f'SQLITE_PROFILE: {SQLITE_PROFILE}')
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, SQLITE_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions for endpoints that write. On SQLite their transactions start with BEGIN IMMEDIATE,
+# so concurrent writers (e.g. several server processes) queue on the busy timeout instead of
+# failing when they upgrade from a read lock.
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False,
+                                 bind=engine.execution_options(sqlite_begin="IMMEDIATE"))
 Base = declarative_base()
 
 # Models
@@ -53,12 +141,23 @@ class Problem(Base):
     name = Column(String, index=True)
     suspended = Column(Boolean, default=False, nullable=False)
     suspend_reason = Column(String, nullable=True)
+    # Mirror of due.due_date kept in sync by the Due listeners below; NULL means never scheduled
+    due_date = Column(DateTime, nullable=True)
+    # Review counters maintained on every review write; see src/analytics/counters.py
+    total_reviews = Column(Integer, default=0, nullable=False)
+    correct_reviews = Column(Integer, default=0, nullable=False)
+    current_streak = Column(Integer, default=0, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=True)
     
     # Relationship to reviews
     reviews = relationship("Review", back_populates="problem")
     due = relationship("Due", back_populates="problem")
+    scheduler_state = relationship("SchedulerState", back_populates="problem", uselist=False)
     tags = relationship("Tag", secondary="problem_tags", back_populates="problems")
 
+    # Due queue: unsuspended problems ordered by due date
+    __table_args__ = (Index("ix_problems_due_queue", "suspended", "due_date"),)
+
 class Review(Base):
     __tablename__ = "reviews"
     
@@ -70,16 +169,50 @@ class Review(Base):
     # Relationship to problem
     problem = relationship("Problem", back_populates="reviews")
 
+    # Keyset pagination over the whole log and per problem
+    __table_args__ = (
+        Index("ix_reviews_created_date_id", "created_date", "id"),
+        Index("ix_reviews_problem_id_created_date", "problem_id", "created_date"),
+    )
+
 class Due(Base):
     __tablename__ = "due"
     
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id"))
-    due_date = Column(DateTime)
+    due_date = Column(DateTime, index=True)
     
     # Relationship to problem
     problem = relationship("Problem", back_populates="due")
 
+    # One due date per problem
+    __table_args__ = (Index("uq_due_problem_id", "problem_id", unique=True),)
+
+@event.listens_for(Due, "after_insert")
+@event.listens_for(Due, "after_update")
+def _sync_problem_due_date(mapper, connection, target):
+    connection.execute(
+        update(Problem.__table__).where(Problem.__table__.c.id == target.problem_id).values(due_date=target.due_date)
+    )
+
+class SchedulerState(Base):
+    """Running scheduler state for a problem, folded forward one review at a time."""
+    __tablename__ = "scheduler_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    problem_id = Column(Integer, ForeignKey("problems.id"), unique=True, index=True)
+    scheduler = Column(String, nullable=False)
+    ease_factor = Column(Float, nullable=False)
+    correct_streak = Column(Integer, nullable=False, default=0)
+    interval_days = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)
+    # Outcomes of the most recent reviews, oldest first, as a string of '1'/'0'
+    recent_results = Column(String, nullable=False, default="")
+    last_review_date = Column(DateTime, nullable=True)
+
+    # Relationship to problem
+    problem = relationship("Problem", back_populates="scheduler_state")
+
 class Tag(Base):
     __tablename__ = "tags"
 
@@ -95,6 +228,35 @@ class ProblemTag(Base):
     problem_id = Column(Integer, ForeignKey("problems.id"), index=True)
     tag_id = Column(Integer, ForeignKey("tags.id"), index=True)
 
+    __table_args__ = (Index("uq_problem_tags_problem_id_tag_id", "problem_id", "tag_id", unique=True),)
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while active, for spotting N+1 queries."""
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        # Transaction control emitted by _emit_sqlite_begin isn't a query
+        if not statement.startswith("BEGIN"):
+            self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._record)
+
+def count_queries(bind=None):
+    """Context manager counting statements on ``bind`` (the app engine by default)."""
+    return QueryCounter(bind if bind is not None else engine)
+
 # Create tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
@@ -106,3 +268,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_write_db():
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Optional asyncio path, enabled with ASYNC_DB=1; the engine is only built on first use
+ASYNC_DB = os.getenv("ASYNC_DB", "").lower() in {"1", "true", "yes"}
+_async_session_factories = None
+
+def get_async_sessionmakers():
+    """The read and write async session factories, as SessionLocal and WriteSessionLocal."""
+    global _async_session_factories
+    if _async_session_factories is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL, SQLITE_PROFILE)
+        _async_session_factories = tuple(
+            async_sessionmaker(
+                bind,
+                autoflush=False,
+                # Attributes can't be lazily refreshed outside the greenlet after commit
+                expire_on_commit=False,
+            )
+            for bind in (async_engine, async_engine.execution_options(sqlite_begin="IMMEDIATE"))
+        )
+    return _async_session_factories
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with get_async_sessionmakers()[0]() as db:
+        yield db
+
+# Async counterpart of get_write_db: transactions take the SQLite write lock up front
+async def get_async_write_db():
+    async with get_async_sessionmakers()[1]() as db:
+        yield db
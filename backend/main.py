@@ -1,15 +1,18 @@
-
-from database import Due as DueModel
+import csv
+import io
+import json
+from database import ASYNC_DB, SessionLocal, engine, get_db, get_write_db
 from database import Problem as ProblemModel
 from database import Review as ReviewModel
+from database import SchedulerState as SchedulerStateModel
 from database import Tag as TagModel
-from database import create_tables, engine, get_db
-from datetime import datetime, timedelta
-from fastapi import Depends, FastAPI, HTTPException
+from datetime import datetime
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from migrations import run_migrations
 from pathlib import Path
 from schemas import (
     Problem,
@@ -19,16 +22,34 @@ from schemas import (
     ProblemWithReviews,
     ProblemWithTagObjects,
     Review,
+    ReviewBulkItem,
+    ReviewBulkResponse,
+    ReviewBulkResult,
     ReviewCreate,
     Tag,
 )
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
-from src.problems.dispatch import dispatch_problem
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, selectinload
+from src.analytics.aggregates import compute_analytics
+from src.analytics.cache import analytics_cache, etag_matches
+from src.analytics.counters import increment_counters, recompute_counters
+from src.metrics import MetricsMiddleware, instrument_sql, metrics
+from src.pagination import decode_cursor, encode_cursor
+from src.problems.bank import PROBLEM_BANK_PATH, close_bank, open_bank
+from src.problems.dispatch import dispatch_problem, explain_problem
+from src.problems.executor import generation_executor
+from src.problems.pool import problem_pool
+from src.problems.registry import UnknownProblemError
+from src.profiling import PROFILING_ENABLED, ProfiledRoute, ProfilingMiddleware
 from src.scheduling.dispatch import dispatch_scheduler
+from src.scheduling.due_queue import next_due_problems_with_count, set_due_dates
+from src.scheduling.state import record_review, record_reviews
 from typing import List
 
 app = FastAPI()
+# Lets ProfilingMiddleware profile an endpoint in the thread that runs it
+app.router.route_class = ProfiledRoute
 
 # Define static directory
 static_dir = Path(__file__).parent / "dist"
@@ -62,95 +83,190 @@ app.add_middleware(
     expose_headers=["*"],  # Add this line
 )
 
-# Create tables on startup
+# Per-route latency and SQL timings, exposed on /api/metrics
+instrument_sql()
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in per-request profiling, see src/profiling.py
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# SQLite gave up waiting for the write lock (another process held it past busy_timeout);
+# nothing was written, so tell the client to retry rather than failing with a 500
+@app.exception_handler(OperationalError)
+def database_locked_handler(request: Request, exc: OperationalError):
+    if "database is locked" not in str(exc.orig):
+        raise exc
+    logger.warning(f'Database busy on {request.method} {request.url.path}')
+    return JSONResponse({"detail": "Database is busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+
+# Create tables / apply pending migrations on startup
 @app.on_event("startup")
 def startup_event():
-    create_tables()
-    # Lightweight migration for SQLite: add suspended columns if missing
+    run_migrations(engine)
+
+    # Keep pre-generated problem instances warm for every known problem type
+    db = SessionLocal()
     try:
-        with engine.connect() as conn:
-            cols = conn.exec_driver_sql("PRAGMA table_info('problems')").fetchall()
-            existing_cols = {row[1] for row in cols}
-            if 'suspended' not in existing_cols:
-                conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN suspended BOOLEAN NOT NULL DEFAULT 0")
-                logger.info("Added 'suspended' column to problems table")
-            if 'suspend_reason' not in existing_cols:
-                conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN suspend_reason TEXT NULL")
-                logger.info("Added 'suspend_reason' column to problems table")
-            # create tags tables if not exist
-            conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name VARCHAR, UNIQUE(name))")
-            conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS problem_tags (id INTEGER PRIMARY KEY, problem_id INTEGER, tag_id INTEGER)")
-    except Exception as e:
-        logger.error(f"Migration check failed: {e}")
+        names = [name for (name,) in db.query(ProblemModel.name).distinct()]
+    finally:
+        db.close()
+    if PROBLEM_BANK_PATH:
+        open_bank(PROBLEM_BANK_PATH)
+    generation_executor.start()
+    problem_pool.warm(names)
+    problem_pool.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    problem_pool.stop()
+    generation_executor.stop()
+    close_bank()
+
+@app.get("/api/pool/stats")
+def pool_stats():
+    return problem_pool.stats()
+
+@app.get("/api/metrics")
+def read_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # Problem endpoints
 @app.post("/api/problems/", response_model=Problem)
-def create_problem(problem: ProblemCreate, db: Session = Depends(get_db)):
+def create_problem(problem: ProblemCreate, db: Session = Depends(get_write_db)):
     db_problem = ProblemModel(name=problem.name)
     db.add(db_problem)
     db.commit()
+    analytics_cache.invalidate()
     db.refresh(db_problem)
     return db_problem
 
 @app.get("/api/problems/")
 def read_problems(db: Session = Depends(get_db)):
-    query = (
-        db.query(DueModel, ProblemModel)
-        .outerjoin(DueModel, ProblemModel.id == DueModel.problem_id)
-        .filter(
-            ProblemModel.suspended == False,
-            or_(
-                DueModel.due_date == None,          
-                DueModel.due_date <= datetime.now()     
-            )
-    )
-    )
-    problems_and_due = query.all() 
-    if len(problems_and_due) == 0:
+    due_problems, due_count = next_due_problems_with_count(db)
+    if len(due_problems) == 0:
         # logger.error('No problems found')
         return {}
-    _, problem = problems_and_due[0]
-    logger.info(f'Read problems! - found {len(problems_and_due)}, select {problem.name}')
-    problem_data = dispatch_problem(problem.name)
-    problem_data['id'] = problem.id
+    problem = due_problems[0]
+    logger.info(f'Read problems! - found {due_count}, select {problem.name}')
     try:
-        problem_data['tags'] = [t.name for t in problem.tags] if hasattr(problem, 'tags') else []
-    except Exception:
-        problem_data['tags'] = []
+        problem_data = problem_pool.get(problem.name)
+    except UnknownProblemError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    problem_data['id'] = problem.id
+    problem_data['due_count'] = due_count
+    # Tags were loaded with the due query
+    problem_data['tags'] = [t.name for t in problem.tags]
     return problem_data
 
+@app.get("/api/problems/session")
+def read_problem_session(
+    limit: int = Query(10, ge=1, le=100),
+    tag: List[str] | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Return the next ``limit`` due problems, most overdue first, optionally filtered by tag."""
+    due_problems, due_count = next_due_problems_with_count(db, limit=limit, tags=tag)
+    # Pool misses are generated together: heavy types in parallel on the generation
+    # executor's worker processes (when enabled), the rest inline meanwhile
+    futures = problem_pool.get_many([problem.name for problem in due_problems])
+    problems = []
+    for problem, future in zip(due_problems, futures, strict=True):
+        try:
+            problem_data = future.result()
+        except Exception as e:
+            logger.error(f'Skipping problem {problem.id} in session: {e}')
+            continue
+        problem_data['id'] = problem.id
+        problem_data['tags'] = [t.name for t in problem.tags]
+        problems.append(problem_data)
+    logger.info(f'Read session - {len(problems)} of {due_count} due problems')
+    return {"problems": problems, "due_count": due_count}
+
 @app.post("/api/problems/{problem_id}/suspend", response_model=Problem)
-def suspend_problem(problem_id: int, payload: ProblemSuspendRequest, db: Session = Depends(get_db)):
+def suspend_problem(problem_id: int, payload: ProblemSuspendRequest, db: Session = Depends(get_write_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
     problem.suspended = True
     problem.suspend_reason = payload.reason
     db.commit()
+    analytics_cache.invalidate()
     db.refresh(problem)
     return problem
 @app.get("/api/problems/{problem_id}/demo")
-def demo_problem(problem_id: int, db: Session = Depends(get_db)):
+def demo_problem(problem_id: int, seed: int | None = None, db: Session = Depends(get_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
-    data = dispatch_problem(problem.name)
+    # A seed re-renders a specific instance; without one any pooled instance will do
+    try:
+        data = problem_pool.get(problem.name) if seed is None else dispatch_problem(problem.name, seed)
+    except UnknownProblemError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     data['id'] = problem.id
     return data
+
+@app.get("/api/problems/{problem_id}/explanation")
+def read_problem_explanation(problem_id: int, seed: int, db: Session = Depends(get_db)):
+    """Render the solution explanation for the instance served with ``seed``."""
+    problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
+    if problem is None:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    try:
+        explanation = explain_problem(problem.name, seed)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return {"id": problem.id, "seed": seed, "solution_explanation": explanation}
+
 @app.get("/api/problems/all", response_model=List[ProblemWithTagObjects])
-def list_all_problems(db: Session = Depends(get_db)):
-    problems = db.query(ProblemModel).all()
-    result = []
-    for p in problems:
-        result.append(p)
-    return result
+def list_all_problems(
+    response: Response,
+    *,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    tag: List[str] | None = Query(None),
+    suspended: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    List problems in id order, optionally filtered and paged with a keyset cursor.
+
+    Without ``limit`` every matching problem is returned. When a page is full the cursor for
+    the next one is sent in the ``X-Next-Cursor`` header.
+    """
+    query = db.query(ProblemModel).options(selectinload(ProblemModel.tags))
+    if tag:
+        query = query.filter(ProblemModel.tags.any(TagModel.name.in_(tag)))
+    if suspended is not None:
+        query = query.filter(ProblemModel.suspended == suspended)
+    if created_after is not None:
+        query = query.filter(ProblemModel.created_date >= created_after)
+    if created_before is not None:
+        query = query.filter(ProblemModel.created_date < created_before)
+    if cursor is not None:
+        try:
+            (last_id,) = decode_cursor(cursor, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        query = query.filter(ProblemModel.id > last_id)
+
+    query = query.order_by(ProblemModel.id)
+    if limit is None:
+        return query.all()
+    problems = query.limit(limit).all()
+    if len(problems) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(problems[-1].id)
+    return problems
 
 @app.get("/api/tags", response_model=List[Tag])
 def list_tags(db: Session = Depends(get_db)):
     return db.query(TagModel).all()
 
 @app.post("/api/problems/{problem_id}/tags", response_model=ProblemWithTagObjects)
-def add_tag_to_problem(problem_id: int, payload: ProblemTagUpdate, db: Session = Depends(get_db)):
+def add_tag_to_problem(problem_id: int, payload: ProblemTagUpdate, db: Session = Depends(get_write_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
@@ -167,7 +283,7 @@ def add_tag_to_problem(problem_id: int, payload: ProblemTagUpdate, db: Session =
     return problem
 
 @app.delete("/api/problems/{problem_id}/tags", response_model=ProblemWithTagObjects)
-def remove_tag_from_problem(problem_id: int, payload: ProblemTagUpdate, db: Session = Depends(get_db)):
+def remove_tag_from_problem(problem_id: int, payload: ProblemTagUpdate, db: Session = Depends(get_write_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
@@ -180,39 +296,51 @@ def remove_tag_from_problem(problem_id: int, payload: ProblemTagUpdate, db: Sess
 
 @app.get("/api/problems/suspended", response_model=List[Problem])
 def list_suspended_problems(db: Session = Depends(get_db)):
-    problems = db.query(ProblemModel).filter(ProblemModel.suspended == True).all()
+    problems = (
+        db.query(ProblemModel)
+        .options(selectinload(ProblemModel.tags))
+        .filter(ProblemModel.suspended == True)
+        .all()
+    )
     return problems
 
 @app.post("/api/problems/{problem_id}/unsuspend", response_model=Problem)
-def unsuspend_problem(problem_id: int, db: Session = Depends(get_db)):
+def unsuspend_problem(problem_id: int, db: Session = Depends(get_write_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
     problem.suspended = False
     problem.suspend_reason = None
     db.commit()
+    analytics_cache.invalidate()
     db.refresh(problem)
     return problem
 
 @app.get("/api/problems/{problem_id}", response_model=ProblemWithReviews)
 def read_problem(problem_id: int, db: Session = Depends(get_db)):
-    problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
+    problem = (
+        db.query(ProblemModel)
+        .options(selectinload(ProblemModel.reviews), selectinload(ProblemModel.tags))
+        .filter(ProblemModel.id == problem_id)
+        .first()
+    )
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
     return problem
 
 @app.delete("/api/problems/{problem_id}")
-def delete_problem(problem_id: int, db: Session = Depends(get_db)):
+def delete_problem(problem_id: int, db: Session = Depends(get_write_db)):
     problem = db.query(ProblemModel).filter(ProblemModel.id == problem_id).first()
     if problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
     db.delete(problem)
     db.commit()
+    analytics_cache.invalidate()
     return {"message": "Problem deleted"}
 
 # Review endpoints
 @app.post("/api/reviews/", response_model=Review)
-def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
+def create_review(review: ReviewCreate, db: Session = Depends(get_write_db)):
     # Check if problem exists
     problem = db.query(ProblemModel).filter(ProblemModel.id == review.problem_id).first()
     if not problem:
@@ -220,173 +348,187 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
     
     db_review = ReviewModel(problem_id=review.problem_id, correct=review.correct)
     db.add(db_review)
+    db.flush()
+    increment_counters(db, db_review)
     db.commit()
     db.refresh(db_review)
 
     # find new due date 
     try:
-        all_reviews = db.query(ReviewModel).filter(ReviewModel.problem_id == review.problem_id).all()
         scheduler = dispatch_scheduler("spaced_repetition")
-        next_review_date = scheduler.get_next_review_date(all_reviews)
-
-        # Delete old due date 
-        current_due = db.query(DueModel).filter(DueModel.problem_id == review.problem_id).first()
-        if current_due:
-            current_due.due_date = next_review_date  
-            logger.info(f'Updated due date to {current_due.due_date}')
-        else:
-            current_due = DueModel(due_date=next_review_date, problem_id=review.problem_id)
-            db.add(current_due)
-            logger.info(f'Created new due date {current_due.due_date}')
+        next_review_date = record_review(db, scheduler, db_review)
 
+        set_due_dates(db, {review.problem_id: next_review_date})
+        logger.info(f'Set due date to {next_review_date}')
         db.commit()
-        db.refresh(current_due)
     except Exception as e:
         logger.error(f'Found {e}')
+    analytics_cache.invalidate()
     # logger.info(db_review)
     return db_review
 
+@app.post("/api/reviews/bulk", response_model=ReviewBulkResponse)
+def create_reviews_bulk(reviews: List[ReviewBulkItem], db: Session = Depends(get_write_db)):
+    """Record many reviews in one transaction, rescheduling each affected problem once."""
+    problem_ids = {review.problem_id for review in reviews}
+    known_ids = {
+        problem_id for (problem_id,) in db.query(ProblemModel.id).filter(ProblemModel.id.in_(problem_ids))
+    }
+
+    db_reviews = {}
+    for index, review in enumerate(reviews):
+        if review.problem_id in known_ids:
+            fields = review.model_dump(exclude_none=True)
+            db_reviews[index] = ReviewModel(**fields)
+    db.add_all(db_reviews.values())
+    db.flush()
+    # Offline reviews may predate ones already counted, so recount rather than increment
+    recompute_counters(db, list({db_review.problem_id for db_review in db_reviews.values()}))
+
+    reviews_by_problem = {}
+    for db_review in db_reviews.values():
+        reviews_by_problem.setdefault(db_review.problem_id, []).append(db_review)
+    if reviews_by_problem:
+        scheduler = dispatch_scheduler("spaced_repetition")
+        set_due_dates(db, record_reviews(db, scheduler, reviews_by_problem))
+    db.commit()
+    analytics_cache.invalidate()
+    logger.info(f'Bulk recorded {len(db_reviews)} of {len(reviews)} reviews across {len(reviews_by_problem)} problems')
+
+    results = []
+    for index in range(len(reviews)):
+        if index in db_reviews:
+            results.append(ReviewBulkResult(index=index, created=True, review=db_reviews[index]))
+        else:
+            results.append(ReviewBulkResult(index=index, created=False, detail="Problem not found"))
+    return ReviewBulkResponse(created=len(db_reviews), rescheduled=len(reviews_by_problem), results=results)
+
 @app.get("/api/reviews/", response_model=List[Review])
-def read_reviews(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reviews = db.query(ReviewModel).offset(skip).limit(limit).all()
+def read_reviews(
+    response: Response,
+    *,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    problem_id: int | None = None,
+    correct: bool | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    List reviews oldest first, paged with a keyset cursor on (created_date, id).
+
+    Pass the ``X-Next-Cursor`` header of one page as ``cursor`` to fetch the next. ``skip``
+    still works but costs a scan proportional to its value.
+    """
+    query = db.query(ReviewModel)
+    if problem_id is not None:
+        query = query.filter(ReviewModel.problem_id == problem_id)
+    if correct is not None:
+        query = query.filter(ReviewModel.correct == correct)
+    if since is not None:
+        query = query.filter(ReviewModel.created_date >= since)
+    if until is not None:
+        query = query.filter(ReviewModel.created_date < until)
+    if cursor is not None:
+        try:
+            last_key = decode_cursor(cursor, datetime, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        query = query.filter(tuple_(ReviewModel.created_date, ReviewModel.id) > last_key)
+
+    reviews = query.order_by(ReviewModel.created_date, ReviewModel.id).offset(skip).limit(limit).all()
+    if len(reviews) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(reviews[-1].created_date, reviews[-1].id)
     return reviews
 
+EXPORT_COLUMNS = ["id", "problem_id", "created_date", "correct"]
+
+@app.get("/api/reviews/export")
+def export_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    problem_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    """Stream the review log oldest first as NDJSON or CSV in constant memory."""
+    statement = select(ReviewModel.id, ReviewModel.problem_id, ReviewModel.created_date, ReviewModel.correct)
+    if problem_id is not None:
+        statement = statement.where(ReviewModel.problem_id == problem_id)
+    if since is not None:
+        statement = statement.where(ReviewModel.created_date >= since)
+    if until is not None:
+        statement = statement.where(ReviewModel.created_date < until)
+    statement = statement.order_by(ReviewModel.created_date, ReviewModel.id).execution_options(yield_per=1000)
+
+    def rows():
+        # The session may already have been closed by get_db; it reconnects on first use
+        try:
+            for partition in db.execute(statement).partitions():
+                yield [(id_, problem_id_, created_date.isoformat(), bool(correct))
+                       for id_, problem_id_, created_date, correct in partition]
+        finally:
+            db.close()
+
+    def ndjson():
+        for partition in rows():
+            yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row, strict=True))) + "\n" for row in partition)
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for partition in rows():
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(csv_lines(), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="reviews.csv"'})
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="reviews.ndjson"'})
+
 @app.get("/api/reviews/problem/{problem_id}", response_model=List[Review])
 def read_problem_reviews(problem_id: int, db: Session = Depends(get_db)):
     reviews = db.query(ReviewModel).filter(ReviewModel.problem_id == problem_id).all()
     return reviews
 
 @app.delete("/api/reviews/{review_id}")
-def delete_review(review_id: int, db: Session = Depends(get_db)):
+def delete_review(review_id: int, db: Session = Depends(get_write_db)):
     review = db.query(ReviewModel).filter(ReviewModel.id == review_id).first()
     if review is None:
         raise HTTPException(status_code=404, detail="Review not found")
+    # Stored scheduler state can't be unwound; drop it so the next review rebuilds it from history
+    db.query(SchedulerStateModel).filter(SchedulerStateModel.problem_id == review.problem_id).delete()
     db.delete(review)
+    db.flush()
+    recompute_counters(db, [review.problem_id])
     db.commit()
+    analytics_cache.invalidate()
     return {"message": "Review deleted"}
 
 # Analytics endpoint
 @app.get("/api/analytics/")
-def get_analytics(db: Session = Depends(get_db)):
+def get_analytics(request: Request, db: Session = Depends(get_db)):
     """Get comprehensive analytics data for visualization."""
-    
-    # Get all problems with their due dates
-    problems_query = (
-        db.query(ProblemModel, DueModel)
-        .outerjoin(DueModel, ProblemModel.id == DueModel.problem_id)
-        .all()
-    )
-    
-    # Get all reviews
-    all_reviews = db.query(ReviewModel).all()
-    
-    # Calculate analytics
-    total_problems = len(problems_query)
-    problems_due_today = 0
-    problems_due_this_week = 0
-    problems_due_this_month = 0
-    problems_overdue = 0
-    
-    # Group reviews by problem
-    reviews_by_problem = {}
-    for review in all_reviews:
-        if review.problem_id not in reviews_by_problem:
-            reviews_by_problem[review.problem_id] = []
-        reviews_by_problem[review.problem_id].append(review)
-    
-    # Calculate ease factors and intervals for each problem
-    problem_analytics = []
-    scheduler = dispatch_scheduler("spaced_repetition")
-    
-    for problem, due in problems_query:
-        problem_reviews = reviews_by_problem.get(problem.id, [])
-        
-        # Calculate next review date using scheduler
-        if problem_reviews:
-            next_review_date = scheduler.get_next_review_date(problem_reviews)
-        else:
-            next_review_date = datetime.now() + timedelta(days=1)
-        
-        # Calculate ease factor (simplified)
-        if len(problem_reviews) > 0:
-            recent_reviews = problem_reviews[-10:] if len(problem_reviews) > 10 else problem_reviews
-            correct_count = sum(1 for r in recent_reviews if r.correct)
-            ease_factor = 2.5 + (correct_count - len(recent_reviews) + correct_count) * 0.1
-            ease_factor = max(1.3, min(3.0, ease_factor))
-        else:
-            ease_factor = 2.5
-        
-        # Calculate current interval
-        if len(problem_reviews) == 0:
-            current_interval = 1
-        elif len(problem_reviews) == 1 and problem_reviews[0].correct:
-            current_interval = 6
-        else:
-            # Simplified interval calculation
-            correct_streak = 0
-            for review in reversed(problem_reviews):
-                if review.correct:
-                    correct_streak += 1
-                else:
-                    break
-            
-            if correct_streak <= 1:
-                current_interval = 6 if correct_streak == 1 else 1
-            else:
-                current_interval = min(365, int(6 * (ease_factor ** (correct_streak - 2))))
-        
-        # Check due status
-        now = datetime.now()
-        if due and due.due_date:
-            days_until_due = (due.due_date - now).days
-            if days_until_due < 0:
-                problems_overdue += 1
-            elif days_until_due == 0:
-                problems_due_today += 1
-            elif days_until_due <= 7:
-                problems_due_this_week += 1
-            elif days_until_due <= 30:
-                problems_due_this_month += 1
-        else:
-            # No due date set, consider it due today
-            problems_due_today += 1
-        
-        problem_analytics.append({
-            "problem_id": problem.id,
-            "problem_name": problem.name,
-            "total_reviews": len(problem_reviews),
-            "correct_reviews": sum(1 for r in problem_reviews if r.correct),
-            "ease_factor": round(ease_factor, 2),
-            "current_interval": current_interval,
-            "next_review_date": next_review_date.isoformat(),
-            "due_date": due.due_date.isoformat() if due and due.due_date else None,
-            "days_until_due": (due.due_date - now).days if due and due.due_date else 0
-        })
-    
-    # Calculate overall statistics
-    total_reviews = len(all_reviews)
-    correct_reviews = sum(1 for r in all_reviews if r.correct)
-    overall_accuracy = (correct_reviews / total_reviews * 100) if total_reviews > 0 else 0
-    
-    # Calculate average ease factor
-    avg_ease_factor = sum(p["ease_factor"] for p in problem_analytics) / len(problem_analytics) if problem_analytics else 2.5
-    
-    return {
-        "summary": {
-            "total_problems": total_problems,
-            "total_reviews": total_reviews,
-            "overall_accuracy": round(overall_accuracy, 1),
-            "average_ease_factor": round(avg_ease_factor, 2),
-            "problems_due_today": problems_due_today,
-            "problems_due_this_week": problems_due_this_week,
-            "problems_due_this_month": problems_due_this_month,
-            "problems_overdue": problems_overdue
-        },
-        "problems": problem_analytics,
-        "generated_at": datetime.now().isoformat()
-    }
+    payload, etag = analytics_cache.get(lambda: compute_analytics(db))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(payload, headers={"ETag": etag})
 
 
+# Swap the hot endpoints above for their async versions. Done before the catch-all
+# routes below are registered, which would otherwise match their paths first
+if ASYNC_DB:
+    from async_routes import replace_sync_routes
+    replace_sync_routes(app)
+    logger.info('Serving hot endpoints with the async database layer')
+
 # @app.get("/")
 # def read_root():
 #     return {"problem": generate_problem()}
@@ -399,9 +541,7 @@ async def serve_react_app(full_path: str):
     This enables client-side routing to work properly
     """
     # Skip API routes - they should be handled by explicit routes above
-    logger.info(full_path)
     if full_path.startswith("api"):
-        logger.info('IS api request')
         raise HTTPException(status_code=404, detail="API endpoint not found")
     
     # Skip already mounted static routes
@@ -435,6 +575,7 @@ async def catch_all_post(full_path: str):
 
 if __name__ == "__main__":
     import os
+    import tempfile
     import uvicorn
     env = (
         os.getenv("BACKEND_ENV")
@@ -442,5 +583,20 @@ if __name__ == "__main__":
         or os.getenv("ENV")
         or "dev"
     ).lower()
-    port = 9897 if env in {"prd", "prod", "production"} else 8000
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    port = int(os.getenv("PORT") or (9897 if env in {"prd", "prod", "production"} else 8000))
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Every worker imports this module and runs the startup hook; migrate once up front
+        # so they all find the schema current
+        run_migrations(engine)
+        # Workers share nothing but the database file: WAL lets their reads proceed while one
+        # of them writes, and the epoch file carries analytics cache invalidations across them
+        os.environ.setdefault("SQLITE_PROFILE", "production")
+        os.environ.setdefault(
+            "ANALYTICS_CACHE_EPOCH_PATH",
+            os.path.join(tempfile.gettempdir(), f"analytics-cache-epoch-{os.getpid()}"),
+        )
+        logger.info(f'Starting {workers} workers')
+        uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
@@ -0,0 +1,157 @@
+# migrations.py
+# Versioned schema migrations. Each migration runs once, in order, and is recorded in
+# schema_version. Brand new databases are created from the models at the latest version;
+# databases that predate schema_version start at version 0 and run every migration, so
+# each one tolerates finding its change already applied by the old startup checks.
+from database import Base
+from datetime import datetime
+from loguru import logger
+from sqlalchemy import inspect
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info('{table}')")}
+
+
+def create_missing_tables(conn):
+    Base.metadata.create_all(bind=conn)
+
+
+def add_suspension_columns(conn):
+    columns = _columns(conn, "problems")
+    if "suspended" not in columns:
+        conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN suspended BOOLEAN NOT NULL DEFAULT 0")
+    if "suspend_reason" not in columns:
+        conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN suspend_reason TEXT NULL")
+
+
+def add_due_queue(conn):
+    if "due_date" not in _columns(conn, "problems"):
+        conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN due_date DATETIME NULL")
+        _sync_due_date_mirror(conn)
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_problems_due_queue ON problems (suspended, due_date)")
+
+
+def _sync_due_date_mirror(conn):
+    # Copy from the newest due row by id, the one add_due_and_tag_constraints keeps
+    conn.exec_driver_sql(
+        "UPDATE problems SET due_date = "
+        "(SELECT due.due_date FROM due WHERE due.problem_id = problems.id ORDER BY due.id DESC LIMIT 1)"
+    )
+
+
+def add_review_indexes(conn):
+    # (problem_id, created_date) also serves lookups by problem_id alone, and
+    # (created_date, id) serves date range scans
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reviews_created_date_id ON reviews (created_date, id)")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_reviews_problem_id_created_date ON reviews (problem_id, created_date)"
+    )
+
+
+def add_due_and_tag_constraints(conn):
+    # Keep the newest due row and a single link per (problem, tag) before enforcing uniqueness
+    conn.exec_driver_sql("DELETE FROM due WHERE id NOT IN (SELECT MAX(id) FROM due GROUP BY problem_id)")
+    # Databases past migration 3 may have mirrored a due row that was just deleted
+    _sync_due_date_mirror(conn)
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS uq_due_problem_id ON due (problem_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_due_due_date ON due (due_date)")
+    conn.exec_driver_sql(
+        "DELETE FROM problem_tags WHERE id NOT IN (SELECT MIN(id) FROM problem_tags GROUP BY problem_id, tag_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_problem_tags_problem_id_tag_id ON problem_tags (problem_id, tag_id)"
+    )
+
+
+def add_review_counters(conn):
+    columns = _columns(conn, "problems")
+    for column in ["total_reviews", "correct_reviews", "current_streak"]:
+        if column not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE problems ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    if "last_reviewed_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE problems ADD COLUMN last_reviewed_at DATETIME NULL")
+    # Backfill from the review log. Spelled out here rather than calling the app's
+    # recompute_counters, so later changes to it can't change what this migration does.
+    # The streak is the number of reviews newer than the newest miss.
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE review_counters (problem_id INTEGER PRIMARY KEY, total_reviews INTEGER, "
+        "correct_reviews INTEGER, current_streak INTEGER, last_reviewed_at DATETIME)"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO review_counters "
+        "SELECT problem_id, COUNT(*), SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END), "
+        "COALESCE(MIN(CASE WHEN correct = 0 THEN rn END) - 1, COUNT(*)), MAX(created_date) "
+        "FROM (SELECT problem_id, correct, created_date, "
+        "ROW_NUMBER() OVER (PARTITION BY problem_id ORDER BY created_date DESC, id DESC) AS rn FROM reviews) "
+        "WHERE problem_id IS NOT NULL GROUP BY problem_id"
+    )
+    conn.exec_driver_sql(
+        "UPDATE problems SET "
+        "total_reviews = COALESCE((SELECT total_reviews FROM review_counters WHERE problem_id = problems.id), 0), "
+        "correct_reviews = COALESCE((SELECT correct_reviews FROM review_counters WHERE problem_id = problems.id), 0), "
+        "current_streak = COALESCE((SELECT current_streak FROM review_counters WHERE problem_id = problems.id), 0), "
+        "last_reviewed_at = (SELECT last_reviewed_at FROM review_counters WHERE problem_id = problems.id)"
+    )
+    conn.exec_driver_sql("DROP TABLE temp.review_counters")
+
+
+MIGRATIONS = [
+    (1, "create missing tables", create_missing_tables),
+    (2, "problem suspension columns", add_suspension_columns),
+    (3, "problems.due_date due queue", add_due_queue),
+    (4, "review pagination indexes", add_review_indexes),
+    (5, "unique due per problem and problem tag links", add_due_and_tag_constraints),
+    (6, "per-problem review counters", add_review_counters),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _record(conn, version: int, name: str):
+    conn.exec_driver_sql(
+        "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+        (version, name, datetime.utcnow().isoformat()),
+    )
+
+
+def current_version(conn) -> int:
+    return conn.exec_driver_sql("SELECT COALESCE(MAX(version), 0) FROM schema_version").scalar()
+
+
+def run_migrations(engine) -> int:
+    """
+    Bring the database up to ``LATEST_VERSION``, running only pending migrations.
+
+    An up to date database costs two lookups: that schema_version exists, and its version.
+
+    Returns:
+        int: The number of migrations applied
+    """
+    with engine.begin() as conn:
+        if inspect(conn).has_table("schema_version") and current_version(conn) == LATEST_VERSION:
+            return 0
+
+    # Take the write lock before checking the version, so server processes starting
+    # together apply each migration once instead of racing each other
+    writer = engine.execution_options(sqlite_begin="IMMEDIATE")
+    with writer.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)"
+        )
+        if current_version(conn) == 0 and not inspect(conn).has_table("problems"):
+            Base.metadata.create_all(bind=conn)
+            for version, name, _ in MIGRATIONS:
+                _record(conn, version, name)
+            logger.info(f'Created schema at version {LATEST_VERSION}')
+            return 0
+
+    applied = 0
+    for version, name, migrate in MIGRATIONS:
+        with writer.begin() as conn:
+            if version <= current_version(conn):
+                continue
+            migrate(conn)
+            _record(conn, version, name)
+        logger.info(f'Applied migration {version}: {name}')
+        applied += 1
+    return applied
@@ -1,5 +1,5 @@
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from pydantic import BaseModel, field_validator
 from typing import List
 
 ### problem 
@@ -15,7 +15,17 @@ class Problem(ProblemBase):
     created_date: datetime
     suspended: bool = False
     suspend_reason: str | None = None
+    total_reviews: int = 0
+    correct_reviews: int = 0
+    current_streak: int = 0
+    last_reviewed_at: datetime | None = None
     tags: List[str] = []
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tag_names(cls, tags):
+        # ORM problems carry Tag objects; this schema exposes just their names
+        return [getattr(tag, "name", tag) for tag in tags]
     
     class Config:
         from_attributes = True
@@ -35,6 +45,29 @@ class Review(ReviewBase):
     class Config:
         from_attributes = True
 
+class ReviewBulkItem(ReviewCreate):
+    # Offline sessions send when the answer was given; defaults to insert time
+    created_date: datetime | None = None
+
+    @field_validator("created_date")
+    @classmethod
+    def naive_utc(cls, created_date):
+        # Stored dates are naive UTC; aware ones can't be compared with them
+        if created_date is not None and created_date.tzinfo is not None:
+            return created_date.astimezone(timezone.utc).replace(tzinfo=None)
+        return created_date
+
+class ReviewBulkResult(BaseModel):
+    index: int
+    created: bool
+    review: Review | None = None
+    detail: str | None = None
+
+class ReviewBulkResponse(BaseModel):
+    created: int
+    rescheduled: int
+    results: List[ReviewBulkResult]
+
 
 class ProblemWithReviews(Problem):
     reviews: List[Review] = []
@@ -49,6 +82,10 @@ class ProblemWithTagObjects(ProblemBase):
     created_date: datetime
     suspended: bool
     suspend_reason: str | None
+    total_reviews: int = 0
+    correct_reviews: int = 0
+    current_streak: int = 0
+    last_reviewed_at: datetime | None = None
     tags: List[Tag] = []
     class Config:
         from_attributes = True
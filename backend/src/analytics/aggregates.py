@@ -0,0 +1,172 @@
+from database import Problem, Review, SchedulerState
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+from src.scheduling.spaced_repetition import SpacedRepetitionScheduler
+
+# Number of most recent reviews that feed the dashboard ease factor
+RECENT_WINDOW = 10
+
+
+def per_problem_review_stats(problem_ids: list[int] | None = None):
+    """
+    One row per reviewed problem: totals, recent-window counts, current correct streak and
+    last review date, aggregated in SQL over reviews ranked newest first. Restricted to
+    ``problem_ids`` when given.
+    """
+    ranked = select(
+        Review.problem_id,
+        Review.correct,
+        Review.created_date,
+        func.row_number()
+        .over(partition_by=Review.problem_id, order_by=(Review.created_date.desc(), Review.id.desc()))
+        .label("rn"),
+    )
+    if problem_ids is not None:
+        ranked = ranked.where(Review.problem_id.in_(problem_ids))
+    ranked = ranked.subquery()
+    return (
+        select(
+            ranked.c.problem_id,
+            func.count().label("total_reviews"),
+            func.sum(case((ranked.c.correct == True, 1), else_=0)).label("correct_reviews"),  # noqa: E712
+            func.sum(case((ranked.c.rn <= RECENT_WINDOW, 1), else_=0)).label("recent_reviews"),
+            func.sum(case((and_(ranked.c.rn <= RECENT_WINDOW, ranked.c.correct == True), 1), else_=0))  # noqa: E712
+            .label("recent_correct"),
+            # Rank of the newest miss; everything newer than it is the current correct streak
+            func.min(case((ranked.c.correct == False, ranked.c.rn))).label("newest_miss_rank"),  # noqa: E712
+            func.max(ranked.c.created_date).label("last_review_date"),
+        )
+        .group_by(ranked.c.problem_id)
+        .subquery()
+    )
+
+
+def _dashboard_ease_factor(recent_correct: int, recent_reviews: int) -> float:
+    if recent_reviews == 0:
+        return 2.5
+    ease_factor = 2.5 + (recent_correct - recent_reviews + recent_correct) * 0.1
+    return max(1.3, min(3.0, ease_factor))
+
+
+def _dashboard_interval(total_reviews: int, correct_streak: int, ease_factor: float) -> int:
+    if total_reviews == 0:
+        return 1
+    if correct_streak <= 1:
+        return 6 if correct_streak == 1 else 1
+    # Anything past ~20 doublings is already over the cap; bounding the exponent avoids float overflow
+    return min(365, int(6 * (ease_factor ** min(correct_streak - 2, 64))))
+
+
+def _due_buckets(db: Session, now: datetime) -> dict:
+    """Bucket problems by due date in SQL. Problems without a due date count as due today."""
+    due = Problem.due_date
+    row = db.query(
+        func.sum(case((due < now, 1), else_=0)),
+        func.sum(case((or_(due == None, and_(due >= now, due < now + timedelta(days=1))), 1), else_=0)),  # noqa: E711
+        func.sum(case((and_(due >= now + timedelta(days=1), due < now + timedelta(days=8)), 1), else_=0)),
+        func.sum(case((and_(due >= now + timedelta(days=8), due < now + timedelta(days=31)), 1), else_=0)),
+    ).one()
+    overdue, today, this_week, this_month = (value or 0 for value in row)
+    return {
+        "problems_due_today": today,
+        "problems_due_this_week": this_week,
+        "problems_due_this_month": this_month,
+        "problems_overdue": overdue,
+    }
+
+
+def _recent_windows(db: Session, rows: list) -> dict[int, tuple[int, int]]:
+    """
+    (correct, total) over the most recent reviews of each reviewed problem, read from the
+    stored scheduler state. Problems without one yet (e.g. right after one of their reviews
+    was deleted) fall back to ranking just their own reviews.
+    """
+    windows = {}
+    missing = []
+    for row in rows:
+        if row.recent_results is not None:
+            windows[row.id] = (row.recent_results.count("1"), len(row.recent_results))
+        elif row.total_reviews:
+            missing.append(row.id)
+    if missing:
+        stats = per_problem_review_stats(missing)
+        for row in db.execute(select(stats.c.problem_id, stats.c.recent_correct, stats.c.recent_reviews)):
+            windows[row.problem_id] = (row.recent_correct, row.recent_reviews)
+    return windows
+
+
+def compute_analytics(db: Session, now: datetime | None = None) -> dict:
+    """
+    Build the analytics payload from the review counters and scheduler state kept on each
+    problem.
+
+    Every problem is a single-row read, so cost scales with the number of problems rather
+    than the number of reviews.
+    """
+    now = now or datetime.now()
+    scheduler = SpacedRepetitionScheduler()
+
+    rows = (
+        db.query(
+            Problem.id,
+            Problem.name,
+            Problem.due_date,
+            Problem.total_reviews,
+            Problem.correct_reviews,
+            Problem.current_streak,
+            Problem.last_reviewed_at,
+            SchedulerState.recent_results,
+        )
+        .outerjoin(
+            SchedulerState,
+            and_(SchedulerState.problem_id == Problem.id, SchedulerState.scheduler == scheduler.name),
+        )
+        .order_by(Problem.id)
+        .all()
+    )
+    recent_windows = _recent_windows(db, rows)
+
+    problem_analytics = []
+    for row in rows:
+        total_reviews = row.total_reviews
+        correct_streak = row.current_streak
+        recent_correct, recent_reviews = recent_windows.get(row.id, (0, 0))
+        ease_factor = _dashboard_ease_factor(recent_correct, recent_reviews)
+
+        if total_reviews:
+            scheduler_ease = scheduler._ease_factor_from_counts(recent_correct, recent_reviews)
+            interval_days = scheduler._interval_for_streak(correct_streak, scheduler_ease)
+            next_review_date = row.last_reviewed_at + timedelta(days=interval_days)
+        else:
+            next_review_date = now + timedelta(days=1)
+
+        problem_analytics.append({
+            "problem_id": row.id,
+            "problem_name": row.name,
+            "total_reviews": total_reviews,
+            "correct_reviews": row.correct_reviews,
+            "ease_factor": round(ease_factor, 2),
+            "current_interval": _dashboard_interval(total_reviews, correct_streak, ease_factor),
+            "next_review_date": next_review_date.isoformat(),
+            "due_date": row.due_date.isoformat() if row.due_date else None,
+            "days_until_due": (row.due_date - now).days if row.due_date else 0
+        })
+
+    total_reviews = sum(p["total_reviews"] for p in problem_analytics)
+    correct_reviews = sum(p["correct_reviews"] for p in problem_analytics)
+    overall_accuracy = (correct_reviews / total_reviews * 100) if total_reviews > 0 else 0
+
+    avg_ease_factor = sum(p["ease_factor"] for p in problem_analytics) / len(problem_analytics) if problem_analytics else 2.5
+
+    return {
+        "summary": {
+            "total_problems": len(problem_analytics),
+            "total_reviews": total_reviews,
+            "overall_accuracy": round(overall_accuracy, 1),
+            "average_ease_factor": round(avg_ease_factor, 2),
+            **_due_buckets(db, now),
+        },
+        "problems": problem_analytics,
+        "generated_at": now.isoformat()
+    }
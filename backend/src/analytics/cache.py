@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from loguru import logger
+from pathlib import Path
+from typing import Awaitable, Callable
+
+
+class AnalyticsCache:
+    """
+    Single cached analytics snapshot with an ETag.
+
+    Endpoints that change reviews or problems call ``invalidate``; the snapshot also
+    expires after ``ttl_seconds`` since due buckets drift with the clock. When ``path``
+    is set the snapshot is persisted as JSON so a restarted process can serve it warm.
+
+    Each server process keeps its own snapshot. With several processes, set ``epoch_path``
+    to a file they all share: ``invalidate`` bumps its mtime and every process drops a
+    snapshot taken before the latest bump, at the cost of one ``stat`` per lookup.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, path: str | None = None, epoch_path: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self.epoch_path = Path(epoch_path) if epoch_path else None
+        self._lock = threading.Lock()
+        self._payload: dict | None = None
+        self._etag: str | None = None
+        self._created_at = 0.0
+        self._epoch = 0
+        if self.path is not None:
+            self._load()
+
+    def get(self, compute: Callable[[], dict]) -> tuple[dict, str]:
+        """Return the cached snapshot and its ETag, recomputing it if missing or expired."""
+        with self._lock:
+            epoch = self._read_epoch()
+            cached = self._fresh(epoch)
+            if cached is not None:
+                return cached
+            return self._store(compute(), epoch)
+
+    async def aget(self, compute: Callable[[], Awaitable[dict]]) -> tuple[dict, str]:
+        """Async ``get``. Concurrent misses may each compute; the last one stored wins."""
+        with self._lock:
+            epoch = self._read_epoch()
+            cached = self._fresh(epoch)
+        if cached is not None:
+            return cached
+        payload = await compute()
+        with self._lock:
+            return self._store(payload, epoch)
+
+    def _read_epoch(self) -> int:
+        if self.epoch_path is None:
+            return 0
+        try:
+            return self.epoch_path.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def _fresh(self, epoch: int) -> tuple[dict, str] | None:
+        if (self._payload is not None and self._epoch == epoch
+                and time.time() - self._created_at < self.ttl_seconds):
+            return self._payload, self._etag
+        return None
+
+    def _store(self, payload: dict, epoch: int) -> tuple[dict, str]:
+        # ``epoch`` was read before computing, so an invalidation that lands mid-compute
+        # leaves this snapshot already stale
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+        self._payload = payload
+        self._etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self._created_at = time.time()
+        self._epoch = epoch
+        if self.path is not None:
+            self._save()
+        return self._payload, self._etag
+
+    def invalidate(self):
+        with self._lock:
+            self._payload = None
+            self._etag = None
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+            if self.epoch_path is not None:
+                self._bump_epoch()
+
+    def _bump_epoch(self):
+        try:
+            self.epoch_path.touch()
+            now = time.time_ns()
+            os.utime(self.epoch_path, ns=(now, now))
+        except OSError as e:
+            logger.error(f'Could not bump analytics cache epoch {self.epoch_path}: {e}')
+
+    def _save(self):
+        try:
+            self.path.write_text(json.dumps({
+                "payload": self._payload,
+                "etag": self._etag,
+                "created_at": self._created_at,
+            }))
+        except OSError as e:
+            logger.error(f'Could not persist analytics snapshot to {self.path}: {e}')
+
+    def _load(self):
+        try:
+            snapshot = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        self._payload = snapshot["payload"]
+        self._etag = snapshot["etag"]
+        self._created_at = snapshot["created_at"]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+analytics_cache = AnalyticsCache(
+    ttl_seconds=float(os.getenv("ANALYTICS_CACHE_TTL", "300")),
+    path=os.getenv("ANALYTICS_CACHE_PATH"),
+    epoch_path=os.getenv("ANALYTICS_CACHE_EPOCH_PATH"),
+)
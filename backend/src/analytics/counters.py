@@ -0,0 +1,97 @@
+from .aggregates import per_problem_review_stats
+from database import Problem, Review
+from loguru import logger
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+COUNTER_FIELDS = ["total_reviews", "correct_reviews", "current_streak", "last_reviewed_at"]
+
+
+def increment_counters(db: Session, review: Review):
+    """
+    Bump a problem's review counters for one new review with a single atomic UPDATE.
+
+    Assumes ``review`` is the newest review of its problem; use ``recompute_counters``
+    for anything else.
+    """
+    db.execute(
+        update(Problem)
+        .where(Problem.id == review.problem_id)
+        .values(
+            total_reviews=Problem.total_reviews + 1,
+            correct_reviews=Problem.correct_reviews + (1 if review.correct else 0),
+            current_streak=Problem.current_streak + 1 if review.correct else 0,
+            last_reviewed_at=case(
+                (Problem.last_reviewed_at > review.created_date, Problem.last_reviewed_at),
+                else_=review.created_date,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _counters_from_history(db: Session, problem_ids: list[int] | None = None) -> dict[int, dict]:
+    stats = per_problem_review_stats(problem_ids)
+    counters = {}
+    for row in db.execute(select(stats)):
+        counters[row.problem_id] = {
+            "total_reviews": row.total_reviews,
+            "correct_reviews": row.correct_reviews,
+            "current_streak": row.total_reviews if row.newest_miss_rank is None else row.newest_miss_rank - 1,
+            "last_reviewed_at": row.last_review_date,
+        }
+    return counters
+
+
+def _empty_counters() -> dict:
+    return {"total_reviews": 0, "correct_reviews": 0, "current_streak": 0, "last_reviewed_at": None}
+
+
+def recompute_counters(db: Session, problem_ids: list[int] | None = None) -> int:
+    """
+    Recompute review counters from the review log for ``problem_ids`` (every problem if None).
+
+    Returns:
+        int: The number of problems updated
+    """
+    counters = _counters_from_history(db, problem_ids)
+    query = db.query(Problem.id)
+    if problem_ids is not None:
+        query = query.filter(Problem.id.in_(problem_ids))
+    rows = [{"id": problem_id, **counters.get(problem_id, _empty_counters())} for (problem_id,) in query]
+    if rows:
+        db.execute(update(Problem), rows)
+    return len(rows)
+
+
+def check_counters(db: Session) -> list[int]:
+    """Return the ids of problems whose stored counters disagree with the review log."""
+    counters = _counters_from_history(db)
+    inconsistent = []
+    for problem in db.query(Problem.id, *(getattr(Problem, field) for field in COUNTER_FIELDS)):
+        expected = counters.get(problem.id, _empty_counters())
+        if any(getattr(problem, field) != expected[field] for field in COUNTER_FIELDS):
+            inconsistent.append(problem.id)
+    return inconsistent
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal, engine
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Check per-problem review counters against the review log")
+    parser.add_argument("--repair", action="store_true", help="recompute the counters of inconsistent problems")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        inconsistent = check_counters(db)
+        logger.info(f'{len(inconsistent)} problems have inconsistent review counters: {inconsistent}')
+        if args.repair and inconsistent:
+            recompute_counters(db, inconsistent)
+            db.commit()
+            logger.info(f'Repaired review counters for {len(inconsistent)} problems')
+    finally:
+        db.close()
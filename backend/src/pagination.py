@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*key) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Decode a cursor produced by ``encode_cursor`` back into typed sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed or doesn't match ``types``
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list):
+            raise ValueError("not a list of values")
+        # strict: a short or padded payload raises rather than being silently truncated
+        return tuple(datetime.fromisoformat(value) if type_ is datetime else type_(value)
+                     for value, type_ in zip(values, types, strict=True))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -1,13 +1,13 @@
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
 class ArithmeticIntensity(Problem):
-    def generate_problem(self):
-        flop_per_thread = random.randint(5,30)
-        memory_access_per_thread = random.randint(5,30)
-        memory_access_size_bits = random.choice([8, 16, 32, 64, 128, 256])
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
+        flop_per_thread = rng.randint(5,30)
+        memory_access_per_thread = rng.randint(5,30)
+        memory_access_size_bits = rng.choice([8, 16, 32, 64, 128, 256])
         
         problem_data = {
             'flop_per_thread': flop_per_thread,
@@ -20,16 +20,18 @@ class ArithmeticIntensity(Problem):
 
 Calculate arithmetic intensity for a kernel with {flop_per_thread} flops per thread, {memory_access_per_thread} memory accesses per thread and access size of {memory_access_size_bits} bits. Round to 2dp:"""
         answer = self.solve(flop_per_thread, memory_access_size_bits, memory_access_per_thread)
-        solution_explanation = self.get_solution_explanation(problem_data, answer)
         
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             'question': markdown_question,
             'options': options,
             'correct': correct_index,
-            'solution_explanation': solution_explanation
+            'seed': seed
         }
+        if explain:
+            problem['solution_explanation'] = self.get_solution_explanation(problem_data, answer)
+        return problem
 
     def solve(self, flop_per_thread, memory_access_size_bits, memory_access_per_thread):
         bytes_per_thread = (memory_access_size_bits / 8) * memory_access_per_thread
@@ -0,0 +1,157 @@
+import json
+import mmap
+import os
+import random
+import struct
+from .registry import get_generator, list_problems
+from loguru import logger
+from pathlib import Path
+
+MAGIC = b"PRBBANK1"
+# magic, index length
+_HEADER = struct.Struct("<8sQ")
+_OFFSET = struct.Struct("<Q")
+
+# Bank opened at startup, built with ``python -m src.problems.bank``
+PROBLEM_BANK_PATH = os.getenv("PROBLEM_BANK_PATH")
+
+
+class ProblemBank:
+    """
+    Read-only, memory-mapped bank of pre-rendered problem instances.
+
+    File layout::
+
+        header   magic, length of the JSON index
+        index    JSON {"types": {name: [first entry, entry count]}, "entries": n}
+        offsets  n + 1 little-endian uint64 offsets into the blob
+        blob     the JSON payloads of every entry, back to back
+
+    Serving an instance is a random offset read and a ``json.loads``. The file is mapped
+    read-only, so worker processes opening the same bank share its pages.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a problem bank")
+        index = json.loads(self._mm[_HEADER.size:_HEADER.size + index_len])
+        self.types: dict[str, tuple[int, int]] = {name: tuple(span) for name, span in index["types"].items()}
+        self._offsets_start = _HEADER.size + index_len
+        self._blob_start = self._offsets_start + (index["entries"] + 1) * _OFFSET.size
+
+    def __contains__(self, name: str) -> bool:
+        # A type rendered with no entries has nothing to sample; callers fall back to generating it
+        return self.types.get(name, (0, 0))[1] > 0
+
+    def count(self, name: str) -> int:
+        return self.types[name][1]
+
+    def get(self, name: str, index: int) -> dict:
+        """Return entry ``index`` of problem type ``name``."""
+        first, count = self.types[name]
+        if not 0 <= index < count:
+            raise IndexError(index)
+        position = self._offsets_start + (first + index) * _OFFSET.size
+        (start,) = _OFFSET.unpack_from(self._mm, position)
+        (end,) = _OFFSET.unpack_from(self._mm, position + _OFFSET.size)
+        return json.loads(self._mm[self._blob_start + start:self._blob_start + end])
+
+    def sample(self, name: str) -> dict:
+        """Return a random pre-rendered instance of ``name``."""
+        return self.get(name, random.randrange(self.count(name)))
+
+    def close(self):
+        self._mm.close()
+
+
+def build_bank(path: str | Path, names: list[str] | None = None, per_type: int = 1000,
+               max_seeds: int = 20000) -> dict[str, int]:
+    """
+    Render up to ``per_type`` distinct instances of each problem type and write them to ``path``.
+
+    Seeds ``0..max_seeds-1`` are tried in order and an instance is kept when its question has
+    not been seen yet, so types with small parameter spaces end up fully enumerated. Entries
+    keep their seed, so explanations can still be rendered on demand; rebuild the bank
+    whenever a generator changes.
+
+    Returns:
+        dict: Number of entries written per problem type
+    """
+    if names is None:
+        names = [spec.name for spec in list_problems()]
+
+    types, offsets, payloads = {}, [0], []
+    for name in names:
+        generator = get_generator(name)
+        seen = set()
+        first = len(payloads)
+        for seed in range(max_seeds):
+            problem = generator.generate_problem(seed=seed)
+            if problem["question"] in seen:
+                continue
+            seen.add(problem["question"])
+            payload = json.dumps(problem, separators=(",", ":")).encode()
+            payloads.append(payload)
+            offsets.append(offsets[-1] + len(payload))
+            if len(seen) >= per_type:
+                break
+        types[name] = [first, len(payloads) - first]
+        logger.info(f'Rendered {len(payloads) - first} instances of {name}')
+
+    index = json.dumps({"types": types, "entries": len(payloads)}).encode()
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        f.write(b"".join(payloads))
+    # Servers may have the old bank mapped; replacing the file leaves their mapping intact
+    os.replace(tmp_path, path)
+    return {name: count for name, (_, count) in types.items()}
+
+
+_bank: ProblemBank | None = None
+
+
+def open_bank(path: str | Path) -> ProblemBank | None:
+    """Map the bank at ``path`` and serve unseeded problems from it. A missing file is logged and skipped."""
+    global _bank
+    close_bank()
+    try:
+        _bank = ProblemBank(path)
+    except (OSError, ValueError) as e:
+        logger.error(f'Could not open problem bank {path}: {e}')
+        return None
+    logger.info(f'Serving problems from bank {path} ({len(_bank.types)} problem types)')
+    return _bank
+
+
+def get_bank() -> ProblemBank | None:
+    return _bank
+
+
+def close_bank():
+    global _bank
+    if _bank is not None:
+        _bank.close()
+        _bank = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-render problem instances into a memory-mappable bank")
+    parser.add_argument("--out", default="problem_bank.bin")
+    parser.add_argument("--per-type", type=int, default=1000, help="maximum distinct instances per problem type")
+    parser.add_argument("--max-seeds", type=int, default=20000, help="seeds to try per problem type")
+    parser.add_argument("names", nargs="*", help="problem types to include (default: all registered)")
+    args = parser.parse_args()
+
+    counts = build_bank(args.out, args.names or None, args.per_type, args.max_seeds)
+    logger.info(f'Wrote {sum(counts.values())} instances to {args.out}')
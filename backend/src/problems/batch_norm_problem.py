@@ -1,5 +1,4 @@
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
@@ -18,22 +17,23 @@ class BatchNormProblem(Problem):
     We ask for one specific output value yi.
     """
 
-    def generate_problem(self):
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
         # Generate a mini-batch of 3 values
         # Keep values small for easier hand calculation
-        x1 = random.randint(-10, 10)
-        x2 = random.randint(-10, 10)
-        x3 = random.randint(-10, 10)
+        x1 = rng.randint(-10, 10)
+        x2 = rng.randint(-10, 10)
+        x3 = rng.randint(-10, 10)
         
         # Learnable parameters gamma (scale) and beta (shift)
-        gamma = random.choice([0.5, 1.0, 1.5, 2.0])
-        beta = random.randint(-5, 5)
+        gamma = rng.choice([0.5, 1.0, 1.5, 2.0])
+        beta = rng.randint(-5, 5)
         
         # Small epsilon for numerical stability
         epsilon = 0.01
         
         # Which output to ask for (0, 1, or 2)
-        output_index = random.randint(0, 2)
+        output_index = rng.randint(0, 2)
         
         data = {
             "x": [x1, x2, x3],
@@ -45,15 +45,17 @@ class BatchNormProblem(Problem):
 
         markdown_question = self._question_markdown(data)
         answer = self.solve(data)
-        solution_explanation = self.get_solution_explanation(data, answer)
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             "question": markdown_question,
             "options": options,
             "correct": correct_index,
-            "solution_explanation": solution_explanation,
+            "seed": seed,
         }
+        if explain:
+            problem["solution_explanation"] = self.get_solution_explanation(data, answer)
+        return problem
 
     def solve(self, data):
         x = data["x"]
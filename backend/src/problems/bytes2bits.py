@@ -1,12 +1,12 @@
 
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
 class Bytes2Bits(Problem):
-    def generate_problem(self):
-        x = random.randint(0,10)
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
+        x = rng.randint(0,10)
         problem_data = {
             'input_bytes': x
         }
@@ -15,16 +15,18 @@ class Bytes2Bits(Problem):
 
 Convert {x} bytes to bits."""
         answer = self.solve(x)
-        solution_explanation = self.get_solution_explanation(problem_data, answer)
         
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             'question': markdown_question,
             'options': options,
             'correct': correct_index,
-            'solution_explanation': solution_explanation
+            'seed': seed
         }
+        if explain:
+            problem['solution_explanation'] = self.get_solution_explanation(problem_data, answer)
+        return problem
 
     def solve(self, bytes):
         return bytes * 8
@@ -1,27 +1,40 @@
+import os
+import random
+import time
+from ..metrics import problem_generation_duration
+from .bank import get_bank
+from .registry import get_generator
+from functools import lru_cache
 
-from .arithmetic_intensity import ArithmeticIntensity
-from .batch_norm_problem import BatchNormProblem
-from .bytes2bits import Bytes2Bits
-from .linear_program_dual import LinearProgramDual
-from .ram_bandwidth import RamBandwidth
-from .rec_sys_matrix_fact import RecSysMatrixFact
-from .roofline import Roofline
-
-
-def dispatch_problem(name: str):
-    if name == "bytes2bits":
-        return Bytes2Bits().generate_problem()
-    if name == "ram_bandwidth":
-        return RamBandwidth().generate_problem()
-    if name == "arithmetic_intensity":
-        return ArithmeticIntensity().generate_problem()
-    if name == "roofline":
-        return Roofline().generate_problem()
-    if name == "rec_sys_matrix_fact":
-        return RecSysMatrixFact().generate_problem()
-    if name == "linear_program_dual":
-        return LinearProgramDual().generate_problem()
-    if name == "batch_norm":
-        return BatchNormProblem().generate_problem()
-    raise ValueError(f"Unknown problem type: {name}")
 
+def _generate_problem(name: str, seed: int) -> dict:
+    start = time.perf_counter()
+    problem = get_generator(name).generate_problem(seed=seed)
+    problem_generation_duration.observe(time.perf_counter() - start, name)
+    return problem
+
+
+_render_problem = lru_cache(maxsize=int(os.getenv("PROBLEM_CACHE_SIZE", "1024")))(_generate_problem)
+
+
+def dispatch_problem(name: str, seed: int | None = None):
+    """
+    Render an instance of problem type ``name``. Instances are cached by (name, seed), so
+    asking for the same seed again returns the same question without regenerating it.
+    Unseeded requests are served from the problem bank when one is open, and otherwise
+    rendered with a fresh seed that bypasses the cache: nobody can ask for it again until
+    it has been handed out.
+    """
+    if seed is None:
+        bank = get_bank()
+        if bank is not None and name in bank:
+            return bank.sample(name)
+        return _generate_problem(name, random.getrandbits(32))
+    # Callers add per-request keys (id, due_count, ...) to the payload, so hand out a copy
+    return dict(_render_problem(name, seed))
+
+
+@lru_cache(maxsize=int(os.getenv("PROBLEM_CACHE_SIZE", "1024")))
+def explain_problem(name: str, seed: int) -> str:
+    """Render (and cache) the solution explanation for the (name, seed) instance."""
+    return get_generator(name).explain(seed)
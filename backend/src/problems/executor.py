@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import os
+from .bank import get_bank
+from .dispatch import dispatch_problem
+from .registry import get_generator, get_spec, list_problems
+from concurrent.futures import Future, ProcessPoolExecutor
+from loguru import logger
+
+
+def _warm_worker(names: list[str]):
+    # Import the generator modules (and NumPy with them) before the first task arrives
+    for name in names:
+        get_generator(name)
+
+
+def completed(fn, *args) -> Future:
+    """Run ``fn(*args)`` in the calling thread and return its outcome as a finished future."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class GenerationExecutor:
+    """
+    Runs generators of the selected cost classes in a process pool.
+
+    CPU-heavy generators hold the GIL for their whole run, stalling every other request in
+    the worker; in a process pool they only cost the parent a pickle round trip. Other
+    types, types served from the problem bank and everything while the executor is
+    stopped (``workers`` 0) are generated in the calling thread as before.
+    """
+
+    def __init__(self, workers: int = 0, cost_classes: tuple[str, ...] = ("heavy",)):
+        self.workers = workers
+        self.cost_classes = tuple(cost_classes)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self):
+        if self.workers <= 0 or self._executor is not None:
+            return
+        names = [spec.name for spec in list_problems() if spec.cost in self.cost_classes]
+        # spawn rather than fork: the server process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(names,),
+        )
+        # Start every worker now so the first requests don't pay for interpreter start-up
+        for future in [self._executor.submit(_warm_worker, names) for _ in range(self.workers)]:
+            future.result()
+        logger.info(f'Generating {names} in {self.workers} worker processes')
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def uses_processes(self, name: str) -> bool:
+        if self._executor is None or get_spec(name).cost not in self.cost_classes:
+            return False
+        bank = get_bank()
+        return bank is None or name not in bank
+
+    def generate(self, name: str) -> dict:
+        """Generate one instance of ``name``, blocking until it is ready."""
+        if self.uses_processes(name):
+            return self._executor.submit(dispatch_problem, name).result()
+        return dispatch_problem(name)
+
+    def generate_many(self, names: list[str]) -> list[Future]:
+        """
+        Generate one instance of each of ``names``. Those sent to the worker processes are
+        submitted first and run in parallel while the rest are generated in the calling thread.
+        """
+        futures = [self._executor.submit(dispatch_problem, name) if self.uses_processes(name) else None
+                   for name in names]
+        return [future or completed(dispatch_problem, name) for future, name in zip(futures, names, strict=True)]
+
+    async def agenerate(self, name: str) -> dict:
+        """Generate one instance of ``name`` without blocking the event loop."""
+        if self.uses_processes(name):
+            return await asyncio.wrap_future(self._executor.submit(dispatch_problem, name))
+        return await asyncio.to_thread(dispatch_problem, name)
+
+
+generation_executor = GenerationExecutor(
+    workers=int(os.getenv("PROBLEM_PROCESS_WORKERS", "0")),
+    cost_classes=tuple(os.getenv("PROBLEM_PROCESS_COST_CLASSES", "heavy").split(",")),
+)
@@ -210,8 +210,7 @@
 #         )
 
 
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
@@ -229,26 +228,27 @@ class LinearProgramDual(Problem):
     Dimensions are kept small (2 variables, 2 equality constraints) for simplicity.
     """
 
-    def generate_problem(self):
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
         # Diagonal positive definite Q
-        q1 = random.randint(1, 5)
-        q2 = random.randint(1, 5)
+        q1 = rng.randint(1, 5)
+        q2 = rng.randint(1, 5)
 
         # Equality constraints A x = b, A is 2x2 with small ints
-        a11 = random.randint(-3, 3)
-        a12 = random.randint(-3, 3)
-        a21 = random.randint(-3, 3)
-        a22 = random.randint(-3, 3)
+        a11 = rng.randint(-3, 3)
+        a12 = rng.randint(-3, 3)
+        a21 = rng.randint(-3, 3)
+        a22 = rng.randint(-3, 3)
         # Ensure A is not all zeros
         if a11 == a12 == a21 == a22 == 0:
             a11 = 1
 
-        b1 = random.randint(-5, 5)
-        b2 = random.randint(-5, 5)
+        b1 = rng.randint(-5, 5)
+        b2 = rng.randint(-5, 5)
 
         # Provided Lagrange multiplier lambda (2-dim)
-        l1 = random.randint(-3, 3)
-        l2 = random.randint(-3, 3)
+        l1 = rng.randint(-3, 3)
+        l2 = rng.randint(-3, 3)
 
         data = {
             "Q": [q1, q2],  # diagonal entries
@@ -259,15 +259,17 @@ class LinearProgramDual(Problem):
 
         markdown_question = self._question_markdown(data)
         answer = self.solve(data)
-        solution_explanation = self.get_solution_explanation(data, answer)
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             "question": markdown_question,
             "options": options,
             "correct": correct_index,
-            "solution_explanation": solution_explanation,
+            "seed": seed,
         }
+        if explain:
+            problem["solution_explanation"] = self.get_solution_explanation(data, answer)
+        return problem
 
     def solve(self, data):
         q1, q2 = data["Q"]
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import threading
+import time
+from .executor import completed, generation_executor
+from .registry import get_spec
+from collections import deque
+from concurrent.futures import Future
+from loguru import logger
+from typing import Awaitable, Callable
+
+
+class ProblemPool:
+    """
+    Per-problem-type pool of pre-generated problem instances.
+
+    Requests take a ready instance off the pool instead of generating one inline. When a
+    pool drops below ``low_watermark`` a background thread tops it back up to
+    ``high_watermark``. Empty pools (or pools whose refill thread isn't running) fall back
+    to generating synchronously, which is counted as a miss.
+
+    Problem types are registered the first time they are requested or via ``warm``; requests
+    for names missing from the problem registry raise ``UnknownProblemError``. Types whose
+    generator raises are dropped from the pool rather than retried forever.
+
+    ``agenerate`` serves misses from ``aget``; it defaults to running ``generate`` in a thread.
+    ``generate_many`` serves the misses of ``get_many`` together; it defaults to calling
+    ``generate`` for each in turn.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str], dict] = generation_executor.generate,
+        low_watermark: int = 2,
+        high_watermark: int = 8,
+        agenerate: Callable[[str], Awaitable[dict]] | None = None,
+        generate_many: Callable[[list[str]], list[Future]] | None = None,
+    ):
+        if low_watermark > high_watermark:
+            raise ValueError("low_watermark must not exceed high_watermark")
+        self.generate = generate
+        self.agenerate = agenerate or (lambda name: asyncio.to_thread(generate, name))
+        self.generate_many = generate_many or (lambda names: [completed(generate, name) for name in names])
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+
+        self._pools: dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_seconds = 0.0
+        self.last_refill_seconds = 0.0
+
+    def get(self, name: str) -> dict:
+        """Take one problem instance of type ``name``, generating it inline on a miss."""
+        problem = self._take(name)
+        if problem is None:
+            problem = self.generate(name)
+        return problem
+
+    def get_many(self, names: list[str]) -> list[Future]:
+        """
+        Take one instance of each of ``names``, generating all the misses in one
+        ``generate_many`` call. A name that is unknown or fails to generate fails only its
+        own future.
+        """
+        futures = [completed(self._take, name) for name in names]
+        misses = [i for i, future in enumerate(futures) if future.exception() is None and future.result() is None]
+        if misses:
+            generated = self.generate_many([names[i] for i in misses])
+            for i, future in zip(misses, generated, strict=True):
+                futures[i] = future
+        return futures
+
+    async def aget(self, name: str) -> dict:
+        """Async ``get``: a miss awaits ``agenerate`` instead of blocking the event loop."""
+        problem = self._take(name)
+        if problem is None:
+            problem = await self.agenerate(name)
+        return problem
+
+    def _take(self, name: str) -> dict | None:
+        if name not in self._pools:
+            get_spec(name)
+        with self._lock:
+            pool = self._pools.setdefault(name, deque())
+            problem = pool.popleft() if pool else None
+            if problem is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(pool) < self.low_watermark:
+                self._refill_needed.set()
+        return problem
+
+    def warm(self, names: list[str]):
+        """Register problem types ahead of their first request so the refill thread fills them."""
+        with self._lock:
+            for name in names:
+                self._pools.setdefault(name, deque())
+        self._refill_needed.set()
+
+    def refill(self):
+        """Top every pool below its low watermark back up to the high watermark."""
+        with self._lock:
+            targets = {name: self.high_watermark - len(pool)
+                       for name, pool in self._pools.items() if len(pool) < self.low_watermark}
+        if not targets:
+            return
+
+        start = time.perf_counter()
+        for name, count in targets.items():
+            try:
+                generated = [self.generate(name) for _ in range(count)]
+            except Exception as e:
+                logger.error(f'Dropping {name} from problem pool: {e}')
+                with self._lock:
+                    self._pools.pop(name, None)
+                continue
+            with self._lock:
+                if name in self._pools:
+                    self._pools[name].extend(generated)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.refills += 1
+            self.refill_seconds += elapsed
+            self.last_refill_seconds = elapsed
+
+    def start(self):
+        """Start the background refill thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="problem-pool-refill", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refill()
+            except Exception as e:
+                logger.error(f'Problem pool refill failed: {e}')
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests, 3) if requests else 0.0,
+                "refills": self.refills,
+                "total_refill_seconds": round(self.refill_seconds, 4),
+                "last_refill_seconds": round(self.last_refill_seconds, 4),
+                "low_watermark": self.low_watermark,
+                "high_watermark": self.high_watermark,
+                "sizes": {name: len(pool) for name, pool in self._pools.items()},
+            }
+
+
+problem_pool = ProblemPool(
+    low_watermark=int(os.getenv("PROBLEM_POOL_LOW_WATERMARK", "2")),
+    high_watermark=int(os.getenv("PROBLEM_POOL_HIGH_WATERMARK", "8")),
+    agenerate=generation_executor.agenerate,
+    generate_many=generation_executor.generate_many,
+)
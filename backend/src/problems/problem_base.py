@@ -1,11 +1,30 @@
+import random
 from abc import ABC, abstractmethod
 
 
+def seeded_rng(seed: int | None = None) -> tuple[int, random.Random]:
+    """Return ``seed`` (drawing a fresh one if None) and a local generator seeded with it."""
+    if seed is None:
+        seed = random.getrandbits(32)
+    return seed, random.Random(seed)
+
+
 class Problem(ABC):
     @abstractmethod
-    def generate_problem(self):
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        """
+        Generate one problem instance.
+
+        All randomness must come from ``seeded_rng(seed)`` so that the same seed always
+        renders the same instance. The seed is returned in the payload under ``seed``.
+        ``solution_explanation`` is only rendered when ``explain`` is set.
+        """
         pass
 
+    def explain(self, seed):
+        """Render the solution explanation for the instance generated from ``seed``."""
+        return self.generate_problem(seed=seed, explain=True)["solution_explanation"]
+
     @abstractmethod
     def solve(self, problem):
         pass
@@ -1,13 +1,13 @@
 
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
 class RamBandwidth(Problem):
-    def generate_problem(self):
-        bits = random.choice([8, 16, 32, 64, 128, 256])
-        clock_freq = random.choice([0.25, 0.5, 1])
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
+        bits = rng.choice([8, 16, 32, 64, 128, 256])
+        clock_freq = rng.choice([0.25, 0.5, 1])
         DATA_RATE = 2 # double data rate 
         problem_data = {
             'bits': bits,
@@ -20,16 +20,18 @@ Calculate the bandwidth in GB/s for a {bits}-bit DDR bus with clock frequency {c
 
 """
         answer = self.solve(bits, clock_freq, DATA_RATE)
-        solution_explanation = self.get_solution_explanation(problem_data, answer, DATA_RATE)
         
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             'question': markdown_question,
             'options': options,
             'correct': correct_index,
-            'solution_explanation': solution_explanation
+            'seed': seed
         }
+        if explain:
+            problem['solution_explanation'] = self.get_solution_explanation(problem_data, answer, DATA_RATE)
+        return problem
 
     def solve(self, bits, clock_freq, data_rate):
         return (bits / 8) * clock_freq * data_rate
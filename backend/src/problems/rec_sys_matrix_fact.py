@@ -1,37 +1,37 @@
 
 
 import numpy as np
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.latex import matrix_to_latex
 from .utils.options import generate_options
 
 
 class RecSysMatrixFact(Problem):
-    def generate_problem(self):
+    def generate_problem(self, seed=None, *, explain: bool = False):
         """Generate a problem asking to predict a missing rating using matrix factorization"""
+        seed, rng = seeded_rng(seed)
         # Create simple 2D feature vectors for hand calculation
-        num_users = random.choice([2, 3])
-        num_items = random.choice([2, 3])
+        num_users = rng.choice([2, 3])
+        num_items = rng.choice([2, 3])
         num_features = 2  # Keep it simple for hand calculation
         
         # Generate simple integer feature vectors
         user_features = []
         for i in range(num_users):
-            features = [random.randint(1, 3) for _ in range(num_features)]
+            features = [rng.randint(1, 3) for _ in range(num_features)]
             user_features.append(features)
         user_features = np.array(user_features).T
         
         item_features = []
         for i in range(num_items):
-            features = [random.randint(1, 3) for _ in range(num_features)]
+            features = [rng.randint(1, 3) for _ in range(num_features)]
             item_features.append(features)
         item_features = np.array(item_features).T
         
         
         # Choose which rating to predict
-        target_user = random.randint(0, num_users - 1)
-        target_item = random.randint(0, num_items - 1)
+        target_user = rng.randint(0, num_users - 1)
+        target_item = rng.randint(0, num_items - 1)
         
         # Calculate the correct answer
         answer = self.solve(user_features, item_features, target_user, target_item)
@@ -69,16 +69,18 @@ $$
 
 **What rating would User {target_user + 1} give to Item {target_item + 1}?**
 """
-        solution_explanation = self.get_solution_explanation(problem_data, answer)
         
-        options, correct_index = generate_options(answer, variation_range=3)
+        options, correct_index = generate_options(answer, variation_range=3, rng=rng)
         
-        return {
+        problem = {
             'question': markdown_question,
             'options': options,
             'correct': correct_index,
-            'solution_explanation': solution_explanation
+            'seed': seed
         }
+        if explain:
+            problem['solution_explanation'] = self.get_solution_explanation(problem_data, answer)
+        return problem
 
     def solve(self, user_features, item_features, user_idx, item_idx):
         """Solve for missing rating using dot product of user and item feature vectors"""
@@ -0,0 +1,88 @@
+import importlib
+import threading
+from .problem_base import Problem
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProblemSpec:
+    """
+    Registry entry for a problem type.
+
+    ``module`` and ``class_name`` locate the generator class; the module is only imported
+    the first time the type is generated. ``cost`` is a coarse class ("cheap" or "heavy")
+    for callers that want to schedule expensive generators differently.
+    """
+    name: str
+    module: str
+    class_name: str
+    tags: tuple[str, ...] = ()
+    difficulty: str = "easy"
+    cost: str = "cheap"
+
+
+class UnknownProblemError(ValueError):
+    """Raised for a problem type name that isn't registered."""
+
+
+_registry: dict[str, ProblemSpec] = {}
+_generators: dict[str, Problem] = {}
+_lock = threading.Lock()
+
+
+def register_problem(
+    name: str,
+    module: str,
+    class_name: str,
+    tags: tuple[str, ...] = (),
+    difficulty: str = "easy",
+    cost: str = "cheap",
+) -> ProblemSpec:
+    """Register a problem type. Relative module paths resolve against this package."""
+    if name in _registry:
+        raise ValueError(f"Problem type already registered: {name}")
+    spec = ProblemSpec(name, module, class_name, tuple(tags), difficulty, cost)
+    _registry[name] = spec
+    return spec
+
+
+def get_spec(name: str) -> ProblemSpec:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownProblemError(f"Unknown problem type: {name}") from None
+
+
+def list_problems() -> list[ProblemSpec]:
+    return list(_registry.values())
+
+
+def get_generator(name: str) -> Problem:
+    """Return the shared generator instance for ``name``, importing its module on first use."""
+    generator = _generators.get(name)
+    if generator is not None:
+        return generator
+    spec = get_spec(name)
+    with _lock:
+        generator = _generators.get(name)
+        if generator is None:
+            module = importlib.import_module(spec.module, package=__package__)
+            generator = getattr(module, spec.class_name)()
+            _generators[name] = generator
+    return generator
+
+
+register_problem("bytes2bits", ".bytes2bits", "Bytes2Bits",
+                 tags=("units",), difficulty="easy")
+register_problem("ram_bandwidth", ".ram_bandwidth", "RamBandwidth",
+                 tags=("memory", "hardware"), difficulty="easy")
+register_problem("arithmetic_intensity", ".arithmetic_intensity", "ArithmeticIntensity",
+                 tags=("performance", "hardware"), difficulty="medium")
+register_problem("roofline", ".roofline", "Roofline",
+                 tags=("performance", "hardware"), difficulty="medium")
+register_problem("rec_sys_matrix_fact", ".rec_sys_matrix_fact", "RecSysMatrixFact",
+                 tags=("ml", "linear_algebra"), difficulty="medium", cost="heavy")
+register_problem("linear_program_dual", ".linear_program_dual", "LinearProgramDual",
+                 tags=("optimization",), difficulty="hard", cost="heavy")
+register_problem("batch_norm", ".batch_norm_problem", "BatchNormProblem",
+                 tags=("ml",), difficulty="medium", cost="heavy")
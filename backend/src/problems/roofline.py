@@ -1,16 +1,16 @@
-import random
-from .problem_base import Problem
+from .problem_base import Problem, seeded_rng
 from .utils.options import generate_options
 
 
 class Roofline(Problem):
-    def generate_problem(self):
-        peak_flops_gflops = random.randint(2,5) * 100
-        peak_bandwidth = random.randint(2,5) * 100
-        flop_per_thread = random.randint(5,10)
-        memory_access_per_thread = random.randint(5,10)
+    def generate_problem(self, seed=None, *, explain: bool = False):
+        seed, rng = seeded_rng(seed)
+        peak_flops_gflops = rng.randint(2,5) * 100
+        peak_bandwidth = rng.randint(2,5) * 100
+        flop_per_thread = rng.randint(5,10)
+        memory_access_per_thread = rng.randint(5,10)
         
-        memory_access_size_bits = random.choice([8, 16, 32, 64, 128, 256])
+        memory_access_size_bits = rng.choice([8, 16, 32, 64, 128, 256])
         
         problem_data = {
             'flop_per_thread': flop_per_thread,
@@ -31,16 +31,18 @@ Determine (True/False) if kernel is memory bound:
 - memory access per thread = {memory_access_per_thread}
 - memory access size = {memory_access_size_bits}"""
         answer = self.solve(flop_per_thread, memory_access_size_bits, memory_access_per_thread, peak_bandwidth, peak_flops_gflops)
-        solution_explanation = self.get_solution_explanation(problem_data, answer)
         
-        options, correct_index = generate_options(answer)
+        options, correct_index = generate_options(answer, rng=rng)
 
-        return {
+        problem = {
             'question': markdown_question,
             'options': options,
             'correct': correct_index,
-            'solution_explanation': solution_explanation
+            'seed': seed
         }
+        if explain:
+            problem['solution_explanation'] = self.get_solution_explanation(problem_data, answer)
+        return problem
 
     def solve(self, flop_per_thread, memory_access_size_bits, memory_access_per_thread, peak_bandwidth, peak_flops_gflops):
         bytes_per_thread = (memory_access_size_bits / 8) * memory_access_per_thread
@@ -1,125 +1,149 @@
+import math
 import random
+from functools import lru_cache
 
 
-def generate_options(correct_answer, num_options=4, variation_range=None):
+def _default_variation_range(numeric_answer):
+    # Smart variation based on the magnitude of the answer
+    if numeric_answer == 0:
+        return 5
+    if abs(numeric_answer) < 10:
+        return max(2, abs(numeric_answer) * 0.5)
+    if abs(numeric_answer) < 100:
+        return max(5, abs(numeric_answer) * 0.3)
+    return max(10, abs(numeric_answer) * 0.2)
+
+
+def _sample_offsets(rng, count, half_width):
+    """Sample ``count`` distinct non-zero integer offsets from [-half_width, half_width]."""
+    # Widen the range rather than retry when it holds fewer than ``count`` offsets
+    half_width = max(half_width, math.ceil(count / 2))
+    # Indices 0..2w-1 map onto -w..-1 and 1..w, so zero (the answer itself) is never drawn
+    return [i - half_width if i < half_width else i - half_width + 1
+            for i in rng.sample(range(2 * half_width), count)]
+
+
+# Display precision of float options by magnitude: (lowest k, highest k, step, digits),
+# where an option is k * step rounded to ``digits``
+_FLOAT_BANDS = (
+    (-99, 99, 0.01, 2),
+    (10, 99, 0.1, 1),
+    (-99, -10, 0.1, 1),
+    (10, math.inf, 1, 0),
+    (-math.inf, -10, 1, 0),
+)
+
+# Grids up to this many values are rendered once and sampled directly
+_MATERIALIZE_LIMIT = 2000
+
+
+@lru_cache(maxsize=4096)
+def _float_grid(numeric_answer, variation_range, count):
+    """
+    Segments (first k, size, step, digits) of the displayable values within ``variation_range``
+    of the answer, and their total size. The range is widened until it holds ``count`` values.
+    """
+    variation_range = max(variation_range, 0.01)
+    while True:
+        lo, hi = numeric_answer - variation_range, numeric_answer + variation_range
+        segments = []
+        for k_min, k_max, step, digits in _FLOAT_BANDS:
+            first = max(k_min, math.ceil(lo / step - 1e-9))
+            last = min(k_max, math.floor(hi / step + 1e-9))
+            if first <= last:
+                segments.append((first, last - first + 1, step, digits))
+        total = sum(size for _, size, _, _ in segments)
+        if total >= count:
+            return tuple(segments), total
+        variation_range *= 2
+
+
+def _grid_value(segments, index):
+    for first, size, step, digits in segments:
+        if index < size:
+            value = round((first + index) * step, digits)
+            return str(int(value) if digits == 0 else value)
+        index -= size
+    raise IndexError(index)
+
+
+@lru_cache(maxsize=1024)
+def _grid_values(segments):
+    return tuple(_grid_value(segments, index) for index in range(sum(size for _, size, _, _ in segments)))
+
+
+def numeric_distractors(correct_answer, count, rng, variation_range=None):
+    """
+    Distinct wrong answers within ``variation_range`` of a numeric answer.
+
+    Integer answers are offset by whole numbers. Float answers are drawn from the values
+    in range at the precision they are displayed at (2dp below 1, 1dp below 10, whole
+    numbers above), so every draw is a distinct option.
+    """
+    numeric_answer = float(correct_answer)
+    if variation_range is None:
+        variation_range = _default_variation_range(numeric_answer)
+
+    if numeric_answer == int(numeric_answer):
+        base = int(numeric_answer)
+        return [str(base + offset) for offset in _sample_offsets(rng, count, int(variation_range))]
+
+    # Generators draw from small parameter spaces, so the same grids come up over and over
+    segments, total = _float_grid(numeric_answer, variation_range, count + 1)
+    # One extra draw covers the grid point that renders as the answer itself
+    if total <= _MATERIALIZE_LIMIT:
+        candidates = rng.sample(_grid_values(segments), count + 1)
+    else:
+        candidates = [_grid_value(segments, index) for index in rng.sample(range(total), count + 1)]
+    correct = str(correct_answer)
+    return [option for option in candidates if option != correct][:count]
+
+
+def suffix_distractors(correct_answer, count, rng, variation_range=None):
+    """Distinct wrong answers for non-numeric answers: the answer with a numeric suffix."""
+    suffixes = rng.sample(range(1, max(10, count + 1)), count)
+    return [f"{correct_answer}{suffix}" for suffix in suffixes]
+
+
+def generate_options(correct_answer, num_options=4, variation_range=None, rng=None, strategy=None):
     """
     Generate randomized multiple choice options with the correct answer.
-    
+
+    Wrong answers are sampled without replacement, so this runs in bounded time however
+    narrow ``variation_range`` is; a range too small to hold enough distinct values is
+    widened instead of retried.
+
     Args:
         correct_answer: The correct answer (can be int, float, or string)
         num_options: Number of total options (default 4)
         variation_range: Range for generating wrong answers. If None, uses smart defaults.
-    
+        rng: ``random.Random`` to draw from. If None, uses the global ``random`` module.
+        strategy: Optional ``strategy(correct_answer, count, rng, variation_range)`` returning
+            ``count`` distinct wrong answers as strings, for problem types that need their own
+            distractors. Defaults to ``numeric_distractors`` or ``suffix_distractors``.
+
     Returns:
         tuple: (options_list, correct_index)
     """
-    # Convert to float for calculations if it's numeric
-    try:
-        numeric_answer = float(correct_answer)
-        is_numeric = True
-        # Check if the original answer was an integer
-        is_integer = isinstance(correct_answer, int) or (isinstance(correct_answer, str) and correct_answer.isdigit()) or (numeric_answer == int(numeric_answer))
-    except (ValueError, TypeError):
-        is_numeric = False
-        is_integer = False
-        numeric_answer = None
-    
-    options = [str(correct_answer)]
-    
-    if is_numeric:
-        # Smart variation based on the magnitude of the answer
-        if variation_range is None:
-            if numeric_answer == 0:
-                variation_range = 5
-            elif abs(numeric_answer) < 10:
-                variation_range = max(2, abs(numeric_answer) * 0.5)
-            elif abs(numeric_answer) < 100:
-                variation_range = max(5, abs(numeric_answer) * 0.3)
-            else:
-                variation_range = max(10, abs(numeric_answer) * 0.2)
-        
-        # Generate wrong answers with various strategies
-        wrong_answers = []
-        
-        # Strategy 1: Add/subtract variations
-        for _ in range(num_options - 1):
-            if is_integer:
-                # For integer answers, use integer variations
-                variation = random.randint(-int(variation_range), int(variation_range))
-                wrong_answer = int(numeric_answer) + variation
-            else:
-                # For float answers, use float variations
-                variation = random.uniform(-variation_range, variation_range)
-                wrong_answer = numeric_answer + variation
-                
-                # Round to reasonable precision
-                if abs(wrong_answer) < 1:
-                    wrong_answer = round(wrong_answer, 2)
-                elif abs(wrong_answer) < 10:
-                    wrong_answer = round(wrong_answer, 1)
-                else:
-                    wrong_answer = round(wrong_answer)
-            
-            wrong_answers.append(str(wrong_answer))
-        
-        options.extend(wrong_answers)
-    else:
-        # For non-numeric answers, generate simple variations
-        for _ in range(num_options - 1):
-            if isinstance(correct_answer, str):
-                # Simple string variations
-                if correct_answer.isdigit():
-                    base_num = int(correct_answer)
-                    variation = random.randint(-5, 5)
-                    wrong_answer = str(base_num + variation)
-                else:
-                    # For non-numeric strings, just add a suffix
-                    wrong_answer = correct_answer + str(random.randint(1, 9))
-            else:
-                wrong_answer = str(correct_answer) + str(random.randint(1, 9))
-            
-            options.append(wrong_answer)
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_options = []
-    for option in options:
-        if option not in seen:
-            seen.add(option)
-            unique_options.append(option)
-    
-    # If we don't have enough unique options, generate more
-    while len(unique_options) < num_options:
-        if is_numeric:
-            if is_integer:
-                # For integer answers, use integer variations
-                variation = random.randint(-int(variation_range * 2), int(variation_range * 2))
-                wrong_answer = int(numeric_answer) + variation
-            else:
-                # For float answers, use float variations
-                variation = random.uniform(-variation_range * 2, variation_range * 2)
-                wrong_answer = numeric_answer + variation
-                if abs(wrong_answer) < 1:
-                    wrong_answer = round(wrong_answer, 2)
-                elif abs(wrong_answer) < 10:
-                    wrong_answer = round(wrong_answer, 1)
-                else:
-                    wrong_answer = round(wrong_answer)
-            option = str(wrong_answer)
-        else:
-            option = str(correct_answer) + str(random.randint(10, 99))
-        
-        if option not in seen:
-            seen.add(option)
-            unique_options.append(option)
-    
-    # Take only the number of options we need
-    unique_options = unique_options[:num_options]
-    
-    # Shuffle the options
-    random.shuffle(unique_options)
-    
-    # Find the correct index
-    correct_index = unique_options.index(str(correct_answer))
-    
-    return unique_options, correct_index
+    if rng is None:
+        rng = random
+    if strategy is None:
+        try:
+            float(correct_answer)
+            strategy = numeric_distractors
+        except (ValueError, TypeError):
+            strategy = suffix_distractors
+
+    correct = str(correct_answer)
+    count = num_options - 1
+    distractors = [option for option in dict.fromkeys(strategy(correct_answer, count, rng, variation_range))
+                   if option != correct]
+    if len(distractors) < count:
+        raise ValueError(f"Strategy returned {len(distractors)} distinct wrong answers, need {count}")
+
+    # Distractors come out of the sampler in random order, so placing the correct answer
+    # at a random index gives a uniformly shuffled option list
+    options = distractors[:count]
+    correct_index = rng.randrange(num_options)
+    options.insert(correct_index, correct)
+    return options, correct_index
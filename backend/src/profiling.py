@@ -0,0 +1,291 @@
+import asyncio
+import collections
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+from fastapi.routing import APIRoute
+from loguru import logger
+from pathlib import Path
+from urllib.parse import parse_qs
+
+# Opt-in: requests are only profiled when this is set and the request asks for it
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "").lower() in {"1", "true", "yes"}
+# Relative paths are resolved against the backend directory, not the server's working directory
+PROFILE_DIR = Path(__file__).resolve().parent.parent / os.getenv("PROFILE_DIR", "profiles")
+# Profiles kept per route; older ones are deleted as new ones are written
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+
+MODES = {"1": "sample", "true": "sample", "sample": "sample", "cprofile": "cprofile"}
+
+# cProfile hooks the interpreter, so only one request can use it at a time; held while one does
+_cprofile_lock = threading.Lock()
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples the stack of one thread every ``interval`` seconds into collapsed-stack counts.
+
+    Samples are only taken while ``active`` is set, i.e. while the endpoint runs, not while
+    the profiler itself starts up or is being stopped.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self.active = threading.Event()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            if not self.active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = _collapse(frame) if frame is not None else None
+            if stack:
+                self.stacks[stack] += 1
+
+    def stop(self):
+        self.active.clear()
+        self._done.set()
+        self.join()
+
+
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(_STDLIB):
+        filename = filename[len(_STDLIB):]
+    elif os.path.isabs(filename):
+        filename = os.path.relpath(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str | None:
+    """
+    The collapsed stack from the endpoint down to ``frame``, or None when the thread isn't
+    inside the endpoint: a sample can still land just before or after the call, while
+    ``active`` is being flipped.
+    """
+    codes = []
+    while frame is not None and frame.f_code.co_name != "_profiled_call":
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    # The outermost frame has to be the endpoint, not the wrapper's calls into this module
+    if frame is None or not codes or codes[-1].co_filename == __file__:
+        return None
+    return ";".join(_frame_label(code) for code in reversed(codes))
+
+
+class ProfileRequest:
+    """Profiler state for one request, shared between the middleware and the endpoint wrapper."""
+
+    def __init__(self, mode: str, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.mode = mode
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self.profile: cProfile.Profile | None = None
+        self._sampler: _Sampler | None = None
+        self._started_at: float | None = None
+        self.elapsed = 0.0
+
+    def start(self):
+        if self.mode == "cprofile" and not _cprofile_lock.acquire(blocking=False):
+            logger.warning('cProfile is already profiling another request, sampling this one instead')
+            self.mode = "sample"
+        if self.mode == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            self._sampler = None
+        else:
+            self._sampler = _Sampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        self._started_at = time.perf_counter()
+        if self._sampler is not None:
+            # Last thing before the wrapper calls the endpoint
+            self._sampler.active.set()
+
+    def stop(self):
+        if self._started_at is None:
+            return
+        if self._sampler is not None:
+            self._sampler.active.clear()
+        self.elapsed += time.perf_counter() - self._started_at
+        self._started_at = None
+        if self.profile is not None:
+            self.profile.disable()
+            _cprofile_lock.release()
+        else:
+            self._sampler.stop()
+            self.stacks.update(self._sampler.stacks)
+
+    def collapsed(self) -> str:
+        """Sampled stacks in the collapsed format read by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self) -> str:
+        """The profile as text: collapsed stacks, or the cProfile table sorted by cumulative time."""
+        if self.profile is None:
+            return self.collapsed()
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats("cumulative").print_stats(60)
+        return out.getvalue()
+
+    def save(self, directory: Path) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000_000:09d}-{os.getpid()}"
+        if self.profile is not None:
+            path = directory / f"{stem}.prof"
+            self.profile.dump_stats(path)
+        else:
+            path = directory / f"{stem}.collapsed"
+            path.write_text(self.collapsed())
+        return path
+
+
+# Set by ProfilingMiddleware for requests that asked to be profiled
+_profile_request: contextvars.ContextVar[ProfileRequest | None] = contextvars.ContextVar(
+    "profile_request", default=None
+)
+
+
+def _profiled(endpoint):
+    # The profiler has to run in the thread executing the endpoint: sync endpoints run in the
+    # threadpool (with a copy of the request's context), async ones on the event loop, where
+    # other requests interleaving at ``await`` points also end up in the profile
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def _profiled_call(*args, **kwargs):
+            request = _profile_request.get()
+            if request is None:
+                return await endpoint(*args, **kwargs)
+            request.start()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                request.stop()
+    else:
+        @functools.wraps(endpoint)
+        def _profiled_call(*args, **kwargs):
+            request = _profile_request.get()
+            if request is None:
+                return endpoint(*args, **kwargs)
+            request.start()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                request.stop()
+    return _profiled_call
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose endpoint can be profiled per request; a context lookup otherwise."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+def _route_key(scope) -> str:
+    route = getattr(scope.get("route"), "path", None) or "unmatched"
+    return re.sub(r"[^A-Za-z0-9_.{}-]+", "_", f"{scope['method']}{route}").strip("_")
+
+
+def _prune(directory: Path, keep: int):
+    profiles = sorted(directory.iterdir(), key=lambda p: p.stat().st_mtime_ns)
+    for path in profiles[:-keep] if keep > 0 else profiles:
+        path.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests sent with an ``X-Profile`` header or ``profile`` query parameter.
+
+    ``sample`` (or ``1``) samples the endpoint's stack every ``interval`` seconds and
+    produces collapsed stacks for a flamegraph; ``cprofile`` runs it under cProfile. The
+    profile is written to ``directory/<method><route>/`` and its path returned in the
+    ``X-Profile-Path`` header. With ``X-Profile-Output: inline`` (or ``profile_output=inline``)
+    the response body is replaced by the profile as text, and the endpoint's own status is
+    returned in ``X-Profile-Status``.
+
+    Only the endpoint function itself is profiled: dependencies, response serialisation and
+    the body of streaming responses run outside it.
+    """
+
+    def __init__(self, app, directory: str | Path = PROFILE_DIR, keep: int = PROFILE_KEEP,
+                 interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.app = app
+        self.directory = Path(directory)
+        self.keep = keep
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode().lower(): value.decode() for name, value in scope["headers"]}
+        query = parse_qs(scope.get("query_string", b"").decode())
+        mode = MODES.get((headers.get("x-profile") or query.get("profile", [""])[0]).lower())
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        inline = (headers.get("x-profile-output") or query.get("profile_output", [""])[0]).lower() == "inline"
+
+        request = ProfileRequest(mode, self.interval)
+        token = _profile_request.set(request)
+        status = 500
+        saved_path = None
+
+        def save() -> Path:
+            directory = self.directory / _route_key(scope)
+            path = request.save(directory)
+            _prune(directory, self.keep)
+            logger.info(f'Profiled {scope["method"]} {scope["path"]} in {request.elapsed * 1000:.1f} ms: {path}')
+            return path
+
+        async def send_with_profile(message):
+            nonlocal status, saved_path
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if inline:
+                    return
+                # The endpoint has returned by the time its response starts
+                saved_path = save()
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"x-profile-path", str(saved_path).encode())]}
+            elif inline:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _profile_request.reset(token)
+            if saved_path is None:
+                saved_path = save()
+        if inline:
+            body = request.report().encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-path", str(saved_path).encode()),
+                    (b"x-profile-status", str(status).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,68 @@
+from database import Due, Problem, Tag
+from datetime import datetime
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, Session, selectinload
+
+
+def _due_filter(query: Query, now: datetime, tags: list[str] | None = None) -> Query:
+    query = query.filter(
+        Problem.suspended == False,  # noqa: E712
+        or_(Problem.due_date == None, Problem.due_date <= now),  # noqa: E711
+    )
+    if tags:
+        query = query.filter(Problem.tags.any(Tag.name.in_(tags)))
+    return query
+
+
+def next_due_problems(
+    db: Session, limit: int = 1, now: datetime | None = None, tags: list[str] | None = None
+) -> list[Problem]:
+    """
+    Fetch the next ``limit`` due problems straight off the (suspended, due_date) index.
+
+    Never-scheduled problems sort first, then the most overdue. When ``tags`` is given only
+    problems carrying at least one of them are returned. Tags are loaded eagerly.
+    """
+    now = now or datetime.now()
+    return (
+        _due_filter(db.query(Problem), now, tags)
+        .options(selectinload(Problem.tags))
+        .order_by(Problem.due_date, Problem.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def next_due_problems_with_count(
+    db: Session, limit: int = 1, now: datetime | None = None, tags: list[str] | None = None
+) -> tuple[list[Problem], int]:
+    """
+    ``next_due_problems`` along with the number of due problems, counted by a window over
+    the same query instead of a second one.
+    """
+    now = now or datetime.now()
+    rows = (
+        _due_filter(db.query(Problem, func.count().over()), now, tags)
+        .options(selectinload(Problem.tags))
+        .order_by(Problem.due_date, Problem.id)
+        .limit(limit)
+        .all()
+    )
+    return [problem for problem, _ in rows], rows[0][1] if rows else 0
+
+
+def count_due_problems(db: Session, now: datetime | None = None, tags: list[str] | None = None) -> int:
+    """Count due problems in the database rather than materialising them."""
+    now = now or datetime.now()
+    return _due_filter(db.query(func.count(Problem.id)), now, tags).scalar()
+
+
+def set_due_dates(db: Session, due_dates: dict[int, datetime]):
+    """Create or move the due date of each problem, loading existing due rows in one query."""
+    existing = {due.problem_id: due for due in db.query(Due).filter(Due.problem_id.in_(list(due_dates)))}
+    for problem_id, due_date in due_dates.items():
+        due = existing.get(problem_id)
+        if due is None:
+            db.add(Due(problem_id=problem_id, due_date=due_date))
+        else:
+            due.due_date = due_date
@@ -1,10 +1,40 @@
 from abc import ABC, abstractmethod
-from database import Review
-from datetime import datetime
+from database import Review, SchedulerState
+from datetime import datetime, timedelta
 
 
 class Scheduler(ABC):
+    name: str
+
     @abstractmethod
     def get_next_review_date(self, reviews: list[Review]) -> datetime:
         pass
 
+    @abstractmethod
+    def apply_review(self, state: SchedulerState, review: Review) -> datetime:
+        """
+        Fold a single new review into a persisted scheduler state.
+
+        Args:
+            state: The problem's current state, updated in place
+            review: The review being recorded, newer than any already folded in
+
+        Returns:
+            datetime: The next review date
+        """
+        pass
+
+    def next_review_date(self, state: SchedulerState) -> datetime:
+        return state.last_review_date + timedelta(days=state.interval_days)
+
+    def new_state(self, problem_id: int) -> SchedulerState:
+        return SchedulerState(
+            problem_id=problem_id,
+            scheduler=self.name,
+            ease_factor=0.0,
+            correct_streak=0,
+            interval_days=0,
+            review_count=0,
+            recent_results="",
+            last_review_date=None,
+        )
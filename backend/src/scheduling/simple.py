@@ -1,7 +1,7 @@
 
 
 from .scheduler_base import Scheduler
-from database import Review
+from database import Review, SchedulerState
 from datetime import datetime, timedelta
 
 
@@ -24,6 +24,8 @@ class SimpleScheduler(Scheduler):
     - Review 3 (incorrect): Next review in 1 day (reset)
     - Review 4 (correct): Next review in 2 days
     """
+
+    name = "simple"
     
     def get_next_review_date(self, reviews: list[Review]) -> datetime:
         reviews.sort(key=lambda x: x.created_date)
@@ -41,4 +43,13 @@ class SimpleScheduler(Scheduler):
 
         # calculate that day 
         latest_review_day = max([x.created_date for x in reviews])
-        return latest_review_day + timedelta(days=timer + 1)
\ No newline at end of file
+        return latest_review_day + timedelta(days=timer + 1)
+
+    def apply_review(self, state: SchedulerState, review: Review) -> datetime:
+        # The timer above is exactly the current run of correct answers
+        state.correct_streak = state.correct_streak + 1 if review.correct else 0
+        state.interval_days = state.correct_streak + 1
+        state.review_count += 1
+        if state.last_review_date is None or review.created_date > state.last_review_date:
+            state.last_review_date = review.created_date
+        return self.next_review_date(state)
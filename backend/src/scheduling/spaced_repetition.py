@@ -1,6 +1,10 @@
 from .scheduler_base import Scheduler
-from database import Review
+from database import Review, SchedulerState
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class SpacedRepetitionScheduler(Scheduler):
@@ -31,6 +35,10 @@ class SpacedRepetitionScheduler(Scheduler):
     
     This creates a more natural learning curve that adapts to individual performance.
     """
+
+    name = "spaced_repetition"
+    # Number of most recent reviews that contribute to the ease factor
+    recent_window = 10
     
     def __init__(self, initial_ease_factor: float = 2.5, min_ease_factor: float = 1.3, max_ease_factor: float = 3.0):
         self.initial_ease_factor = initial_ease_factor
@@ -57,16 +65,23 @@ class SpacedRepetitionScheduler(Scheduler):
     
     def _calculate_ease_factor(self, reviews: list[Review]) -> float:
         """Calculate the current ease factor based on recent performance."""
-        ease_factor = self.initial_ease_factor
-        
         # Look at the last 10 reviews for performance calculation
-        recent_reviews = reviews[-10:] if len(reviews) > 10 else reviews
-        
-        for review in recent_reviews:
-            if review.correct:
-                ease_factor += 0.1
-            else:
-                ease_factor -= 0.2
+        recent_reviews = reviews[-self.recent_window:]
+        return self._ease_factor_from_results(review.correct for review in recent_reviews)
+
+    def _ease_factor_from_results(self, results) -> float:
+        """Calculate the ease factor from a sequence of correct/incorrect outcomes."""
+        results = list(results)
+        return self._ease_factor_from_counts(sum(1 for correct in results if correct), len(results))
+
+    def _ease_factor_from_counts(self, correct: int, total: int) -> float:
+        """
+        Calculate the ease factor from the number of correct answers among the recent reviews.
+
+        Each correct answer adds 0.1 and each incorrect one subtracts 0.2. The sum is rounded
+        so that scalar, incremental and batch paths agree exactly instead of up to float noise.
+        """
+        ease_factor = round(self.initial_ease_factor + 0.1 * correct - 0.2 * (total - correct), 10)
         
         # Clamp to valid range
         return max(self.min_ease_factor, min(self.max_ease_factor, ease_factor))
@@ -81,7 +96,11 @@ class SpacedRepetitionScheduler(Scheduler):
                 correct_streak += 1
             else:
                 break
-        
+
+        return self._interval_for_streak(correct_streak, ease_factor)
+
+    def _interval_for_streak(self, correct_streak: int, ease_factor: float) -> int:
+        """Calculate the next interval in days from the current run of correct answers."""
         if correct_streak == 0:
             # Failed the last review: short interval
             return 1
@@ -93,6 +112,84 @@ class SpacedRepetitionScheduler(Scheduler):
         base_interval = 6
         for _ in range(correct_streak - 2):
             base_interval = int(base_interval * ease_factor)
+            # Intervals never shrink, so once past the cap the rest of the streak can't matter
+            if base_interval >= 365:
+                break
 
         # Cap at 365 days to prevent extremely long intervals
         return min(base_interval, 365)
+
+    def apply_review(self, state: SchedulerState, review: Review) -> datetime:
+        """Update the stored ease factor, streak and interval from one new review in O(1)."""
+        recent_results = (state.recent_results + ("1" if review.correct else "0"))[-self.recent_window:]
+        state.recent_results = recent_results
+        state.correct_streak = state.correct_streak + 1 if review.correct else 0
+        state.ease_factor = self._ease_factor_from_results(result == "1" for result in recent_results)
+        state.interval_days = self._interval_for_streak(state.correct_streak, state.ease_factor)
+        state.review_count += 1
+        if state.last_review_date is None or review.created_date > state.last_review_date:
+            state.last_review_date = review.created_date
+        return self.next_review_date(state)
+
+    def get_next_review_dates_batch(
+        self, problem_ids: "np.ndarray", created_dates: "np.ndarray", correct: "np.ndarray"
+    ) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Compute next review dates for many problems in one vectorized pass.
+
+        Takes the review log as columns, one entry per review, in any order. Matches
+        ``get_next_review_date`` applied to each problem's reviews.
+
+        Args:
+            problem_ids: Integer problem id of each review
+            created_dates: ``datetime64`` timestamp of each review
+            correct: Boolean outcome of each review
+
+        Returns:
+            tuple: (sorted unique problem ids, ``datetime64[us]`` next review date for each)
+        """
+        # Imported here so serving requests doesn't pay for loading NumPy
+        import numpy as np
+
+        problem_ids = np.asarray(problem_ids)
+        created_dates = np.asarray(created_dates, dtype="datetime64[us]")
+        correct = np.asarray(correct, dtype=bool)
+        if len(problem_ids) == 0:
+            return problem_ids, np.array([], dtype="datetime64[us]")
+
+        # Group by problem, oldest review first; lexsort is stable so ties keep input order
+        order = np.lexsort((created_dates, problem_ids))
+        problem_ids = problem_ids[order]
+        created_dates = created_dates[order]
+        correct = correct[order]
+
+        unique_ids, group_start, group_size = np.unique(problem_ids, return_index=True, return_counts=True)
+        group_end = group_start + group_size - 1
+        group = np.repeat(np.arange(len(unique_ids)), group_size)
+        position = np.arange(len(problem_ids))
+
+        # Ease factor over the most recent reviews of each problem
+        recent = (group_end[group] - position) < self.recent_window
+        recent_total = np.bincount(group, weights=recent, minlength=len(unique_ids))
+        recent_correct = np.bincount(group, weights=recent & correct, minlength=len(unique_ids))
+        recent_incorrect = recent_total - recent_correct
+        ease_factor = np.round(self.initial_ease_factor + 0.1 * recent_correct - 0.2 * recent_incorrect, 10)
+        ease_factor = np.clip(ease_factor, self.min_ease_factor, self.max_ease_factor)
+
+        # Correct streak: distance from the last incorrect review (or the group start) to the end
+        last_incorrect = np.maximum.reduceat(np.where(correct, -1, position), group_start)
+        last_incorrect = np.maximum(last_incorrect, group_start - 1)
+        correct_streak = group_end - last_incorrect
+
+        interval_days = np.where(correct_streak == 0, 1, 6)
+        steps = np.maximum(correct_streak - 2, 0)
+        step = 0
+        active = steps > step
+        while active.any():
+            interval_days = np.where(active, (interval_days * ease_factor).astype(np.int64), interval_days)
+            step += 1
+            active = (steps > step) & (interval_days < 365)
+        interval_days = np.minimum(interval_days, 365)
+
+        latest_review_date = created_dates[group_end]
+        return unique_ids, latest_review_date + interval_days.astype("timedelta64[D]")
@@ -0,0 +1,115 @@
+from .dispatch import dispatch_scheduler
+from .scheduler_base import Scheduler
+from database import Problem, Review, SchedulerState
+from datetime import datetime
+from loguru import logger
+from sqlalchemy.orm import Session
+
+
+def replay_state(scheduler: Scheduler, problem_id: int, reviews: list[Review]) -> SchedulerState:
+    """Build a fresh scheduler state by folding a problem's full review history in date order."""
+    state = scheduler.new_state(problem_id)
+    for review in sorted(reviews, key=lambda r: r.created_date):
+        scheduler.apply_review(state, review)
+    return state
+
+
+def record_review(db: Session, scheduler: Scheduler, review: Review) -> datetime:
+    """
+    Fold a newly committed review into the problem's stored scheduler state.
+
+    Returns:
+        datetime: The next review date
+    """
+    return record_reviews(db, scheduler, {review.problem_id: [review]})[review.problem_id]
+
+
+def record_reviews(
+    db: Session, scheduler: Scheduler, reviews_by_problem: dict[int, list[Review]]
+) -> dict[int, datetime]:
+    """
+    Fold newly added reviews into each problem's stored scheduler state.
+
+    States are loaded in one query and updated in place. Problems without a state row yet,
+    whose state was built by a different scheduler, or that received reviews older than
+    their last folded review are rebuilt from their full history instead, which must
+    already include the new reviews (flushed or committed).
+
+    Returns:
+        dict: Next review date keyed by problem id
+    """
+    problem_ids = list(reviews_by_problem)
+    states = {
+        state.problem_id: state
+        for state in db.query(SchedulerState).filter(SchedulerState.problem_id.in_(problem_ids))
+    }
+
+    next_review_dates = {}
+    stale = []
+    for problem_id, reviews in reviews_by_problem.items():
+        reviews = sorted(reviews, key=lambda r: r.created_date)
+        state = states.get(problem_id)
+        if (
+            state is None
+            or state.scheduler != scheduler.name
+            or (state.last_review_date is not None and reviews[0].created_date < state.last_review_date)
+        ):
+            stale.append(problem_id)
+            continue
+        for review in reviews:
+            next_review_dates[problem_id] = scheduler.apply_review(state, review)
+
+    if stale:
+        for problem_id in stale:
+            if problem_id in states:
+                db.delete(states[problem_id])
+        db.flush()
+        history = {}
+        for review in db.query(Review).filter(Review.problem_id.in_(stale)):
+            history.setdefault(review.problem_id, []).append(review)
+        for problem_id in stale:
+            state = replay_state(scheduler, problem_id, history.get(problem_id, []))
+            db.add(state)
+            next_review_dates[problem_id] = scheduler.next_review_date(state)
+        logger.info(f'Backfilled scheduler state for {len(stale)} problems from their review history')
+
+    return next_review_dates
+
+
+def rebuild_states(db: Session, scheduler: Scheduler) -> int:
+    """
+    Recompute every problem's scheduler state from its full review history.
+
+    Run this after changing a scheduling algorithm. Problems without reviews are left
+    without a state row.
+
+    Returns:
+        int: The number of states rebuilt
+    """
+    db.query(SchedulerState).delete()
+    reviews_by_problem = {}
+    for review in db.query(Review).filter(Review.problem_id.in_(db.query(Problem.id))).all():
+        reviews_by_problem.setdefault(review.problem_id, []).append(review)
+
+    for problem_id, reviews in reviews_by_problem.items():
+        db.add(replay_state(scheduler, problem_id, reviews))
+    db.commit()
+    logger.info(f'Rebuilt {len(reviews_by_problem)} scheduler states with {scheduler.name}')
+    return len(reviews_by_problem)
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal, engine
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Rebuild persisted scheduler state from review history")
+    parser.add_argument("--scheduler", default="spaced_repetition")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        rebuild_states(db, dispatch_scheduler(args.scheduler))
+    finally:
+        db.close()
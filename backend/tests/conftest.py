@@ -1,9 +1,15 @@
 import pytest
-from database import Base, get_db
+from database import Base, count_queries, get_db, get_write_db
 from fastapi.testclient import TestClient
 from main import app
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from src.analytics.cache import analytics_cache
+
+
+# pytest.ini's [tool:pytest] header isn't read by pytest, so its marker list never registers
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: marks tests as slow (deselect with '-m \"not slow\"')")
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -19,6 +25,8 @@ def cleanup_database():
     # Clean up before each test
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # Tests write straight to the database, bypassing the endpoints that invalidate
+    analytics_cache.invalidate()
 
 def override_get_db():
     try:
@@ -28,6 +36,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_write_db] = override_get_db
 
 @pytest.fixture
 def client():
@@ -41,6 +50,11 @@ def db_session():
     finally:
         session.close()
 
+@pytest.fixture
+def query_counter():
+    """Returns a context manager counting SQL statements run against the test database."""
+    return lambda: count_queries(engine)
+
 @pytest.fixture
 def sample_problem_data():
     return {
@@ -1,6 +1,9 @@
 from database import Due, Problem, Review
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from src.analytics.cache import AnalyticsCache
+from src.analytics.counters import check_counters, recompute_counters
+from src.scheduling.spaced_repetition import SpacedRepetitionScheduler
 
 
 class TestAnalyticsCalculations:
@@ -21,6 +24,9 @@ class TestAnalyticsCalculations:
         ]
         db_session.add_all(reviews)
         db_session.commit()
+        # Reviews written directly bypass the counters the review endpoints maintain
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -45,6 +51,8 @@ class TestAnalyticsCalculations:
             ))
         db_session.add_all(reviews)
         db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -102,6 +110,8 @@ class TestAnalyticsCalculations:
         ]
         db_session.add_all(reviews)
         db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -148,6 +158,8 @@ class TestAnalyticsCalculations:
                 )
                 db_session.add(review)
         db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -186,6 +198,8 @@ class TestAnalyticsCalculations:
             db_session.add(review)
         
         db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -209,6 +223,8 @@ class TestAnalyticsCalculations:
         ]
         db_session.add_all(reviews)
         db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
         
         response = client.get("/api/analytics/")
         data = response.json()
@@ -224,6 +240,53 @@ class TestAnalyticsCalculations:
         assert problem_data["current_interval"] > 0
         assert problem_data["current_interval"] <= 365
 
+    def test_analytics_streak_and_next_review_date(self, client: TestClient, db_session):
+        """Test that SQL-derived streaks and next review dates match replaying the scheduler."""
+        problem = Problem(name="streak_test")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.refresh(problem)
+
+        outcomes = [True, False] + [True] * 12
+        reviews = [
+            Review(problem_id=problem.id, correct=correct,
+                   created_date=datetime.now() - timedelta(days=len(outcomes) - i))
+            for i, correct in enumerate(outcomes)
+        ]
+        db_session.add_all(reviews)
+        db_session.commit()
+        recompute_counters(db_session)
+        db_session.commit()
+
+        response = client.get("/api/analytics/")
+        problem_data = response.json()["problems"][0]
+
+        expected = SpacedRepetitionScheduler().get_next_review_date(list(reviews))
+        assert datetime.fromisoformat(problem_data["next_review_date"]) == expected
+        # 10 correct in the recent window, a 12 long streak
+        assert problem_data["ease_factor"] == 3.0
+        assert problem_data["current_interval"] == 365
+        assert problem_data["total_reviews"] == 14
+        assert problem_data["correct_reviews"] == 13
+
+    def test_analytics_reads_counters_not_reviews(self, client: TestClient, db_session, query_counter):
+        """Test that reviewed problems' stats come from their counters and scheduler state."""
+        problem = Problem(name="counter_test")
+        db_session.add(problem)
+        db_session.commit()
+        for correct in [True, False, True, True]:
+            client.post("/api/reviews/", json={"problem_id": problem.id, "correct": correct})
+
+        with query_counter() as counter:
+            problem_data = client.get("/api/analytics/").json()["problems"][0]
+
+        assert not any("FROM reviews" in statement for statement in counter.statements)
+        reviews = db_session.query(Review).filter(Review.problem_id == problem.id).all()
+        expected = SpacedRepetitionScheduler().get_next_review_date(reviews)
+        assert datetime.fromisoformat(problem_data["next_review_date"]) == expected
+        assert problem_data["total_reviews"] == 4
+        assert problem_data["correct_reviews"] == 3
+
     def test_analytics_generated_at_timestamp(self, client: TestClient):
         """Test that generated_at timestamp is present and recent."""
         response = client.get("/api/analytics/")
@@ -236,3 +299,160 @@ class TestAnalyticsCalculations:
         now = datetime.now()
         time_diff = abs((now - generated_at).total_seconds())
         assert time_diff < 60
+
+
+class TestAnalyticsCache:
+    def test_etag_not_modified(self, client: TestClient):
+        """Test that a matching If-None-Match gets a 304 with no body."""
+        first = client.get("/api/analytics/")
+        etag = first.headers["etag"]
+
+        response = client.get("/api/analytics/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_review_invalidates_snapshot(self, client: TestClient, db_session):
+        """Test that posting a review drops the cached snapshot."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.refresh(problem)
+
+        first = client.get("/api/analytics/")
+        assert first.json()["summary"]["total_reviews"] == 0
+
+        client.post("/api/reviews/", json={"problem_id": problem.id, "correct": True})
+
+        response = client.get("/api/analytics/", headers={"If-None-Match": first.headers["etag"]})
+        assert response.status_code == 200
+        assert response.json()["summary"]["total_reviews"] == 1
+
+    def test_suspend_invalidates_snapshot(self, client: TestClient, db_session):
+        """Test that suspending a problem produces a new ETag."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.refresh(problem)
+
+        etag = client.get("/api/analytics/").headers["etag"]
+        client.post(f"/api/problems/{problem.id}/suspend", json={})
+        client.delete(f"/api/problems/{problem.id}")
+
+        response = client.get("/api/analytics/")
+        assert response.headers["etag"] != etag
+        assert response.json()["summary"]["total_problems"] == 0
+
+    def test_snapshot_reused_until_invalidated(self):
+        """Test that the snapshot is computed once and recomputed after invalidation."""
+        cache = AnalyticsCache(ttl_seconds=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {"total_reviews": len(calls)}}
+
+        first, etag = cache.get(compute)
+        again, same_etag = cache.get(compute)
+        assert again is first
+        assert same_etag == etag
+        assert len(calls) == 1
+
+        cache.invalidate()
+        _, new_etag = cache.get(compute)
+        assert len(calls) == 2
+        assert new_etag != etag
+
+    def test_snapshot_expires(self):
+        """Test that a zero TTL always recomputes."""
+        cache = AnalyticsCache(ttl_seconds=0)
+        calls = []
+        cache.get(lambda: calls.append(1) or {})
+        cache.get(lambda: calls.append(1) or {})
+        assert len(calls) == 2
+
+    def test_snapshot_persisted_to_disk(self, tmp_path):
+        """Test that a new cache instance loads a persisted snapshot."""
+        path = tmp_path / "analytics.json"
+        payload, etag = AnalyticsCache(ttl_seconds=60, path=str(path)).get(lambda: {"summary": {}})
+
+        reloaded = AnalyticsCache(ttl_seconds=60, path=str(path))
+        assert reloaded.get(lambda: {"other": True}) == (payload, etag)
+
+        reloaded.invalidate()
+        assert not path.exists()
+
+    def test_invalidation_shared_through_epoch_file(self, tmp_path):
+        """Test that invalidating one process's cache drops the others' snapshots."""
+        epoch_path = str(tmp_path / "epoch")
+        worker_a = AnalyticsCache(ttl_seconds=60, epoch_path=epoch_path)
+        worker_b = AnalyticsCache(ttl_seconds=60, epoch_path=epoch_path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {"total_reviews": len(calls)}}
+
+        worker_b.get(compute)
+        worker_b.get(compute)
+        assert len(calls) == 1
+
+        worker_a.invalidate()
+        payload, _ = worker_b.get(compute)
+        assert len(calls) == 2
+        assert payload["summary"]["total_reviews"] == 2
+
+
+class TestReviewCounters:
+    def test_counters_follow_reviews(self, client: TestClient, db_session):
+        """Test that posting and deleting reviews keeps the problem counters current."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+
+        review_ids = [
+            client.post("/api/reviews/", json={"problem_id": problem.id, "correct": correct}).json()["id"]
+            for correct in [True, False, True, True]
+        ]
+        db_session.refresh(problem)
+        assert (problem.total_reviews, problem.correct_reviews, problem.current_streak) == (4, 3, 2)
+        assert problem.last_reviewed_at is not None
+
+        client.delete(f"/api/reviews/{review_ids[1]}")
+        db_session.refresh(problem)
+        assert (problem.total_reviews, problem.correct_reviews, problem.current_streak) == (3, 3, 3)
+        assert check_counters(db_session) == []
+
+    def test_counters_exposed_on_problem(self, client: TestClient, db_session):
+        """Test that counters are returned by the problem endpoints."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        client.post("/api/reviews/bulk", json=[
+            {"problem_id": problem.id, "correct": True}, {"problem_id": problem.id, "correct": False},
+        ])
+
+        data = client.get(f"/api/problems/{problem.id}").json()
+        assert data["total_reviews"] == 2
+        assert data["correct_reviews"] == 1
+        assert data["current_streak"] == 0
+
+    def test_check_and_repair(self, db_session):
+        """Test that reviews written behind the counters' back are detected and repaired."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.add_all([
+            Review(problem_id=problem.id, correct=False, created_date=datetime.now() - timedelta(days=2)),
+            Review(problem_id=problem.id, correct=True, created_date=datetime.now() - timedelta(days=1)),
+        ])
+        db_session.commit()
+
+        assert check_counters(db_session) == [problem.id]
+        assert recompute_counters(db_session, [problem.id]) == 1
+        db_session.commit()
+        db_session.refresh(problem)
+
+        assert check_counters(db_session) == []
+        assert (problem.total_reviews, problem.correct_reviews, problem.current_streak) == (2, 1, 1)
@@ -1,6 +1,22 @@
-from database import Due, Problem, Review
+import csv
+import io
+import json
+from database import Due, Problem, Review, SchedulerState, Tag, create_db_engine
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from main import app
+from pathlib import Path
+from sqlalchemy import text
+from src.analytics.counters import recompute_counters
+from src.metrics import (
+    _request_stats,
+    _RequestStats,
+    http_request_sql_statements,
+    http_requests,
+    problem_generation_duration,
+)
+from src.pagination import encode_cursor
+from src.profiling import PROFILE_DIR, ProfileRequest, ProfilingMiddleware
 
 
 class TestProblemEndpoints:
@@ -49,6 +65,122 @@ class TestProblemEndpoints:
         assert "correct" in data
         assert "id" in data
 
+    def test_read_problems_skips_future_and_suspended(self, client: TestClient, db_session):
+        """Test that only unsuspended problems that are due are served, most overdue first."""
+        suspended = Problem(name="bytes2bits", suspended=True)
+        future = Problem(name="bytes2bits")
+        recent = Problem(name="bytes2bits")
+        overdue = Problem(name="arithmetic_intensity")
+        db_session.add_all([suspended, future, recent, overdue])
+        db_session.commit()
+        db_session.add_all([
+            Due(problem_id=future.id, due_date=datetime.now() + timedelta(days=3)),
+            Due(problem_id=recent.id, due_date=datetime.now() - timedelta(days=1)),
+            Due(problem_id=overdue.id, due_date=datetime.now() - timedelta(days=5)),
+        ])
+        db_session.commit()
+
+        response = client.get("/api/problems/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == overdue.id
+        assert data["due_count"] == 2
+
+    def test_due_date_mirrored_onto_problem(self, client: TestClient, db_session):
+        """Test that reviewing a problem moves it along the due queue."""
+        problem = Problem(name="arithmetic_intensity")
+        db_session.add(problem)
+        db_session.commit()
+
+        client.post("/api/reviews/", json={"problem_id": problem.id, "correct": True})
+
+        db_session.refresh(problem)
+        due = db_session.query(Due).filter(Due.problem_id == problem.id).first()
+        assert problem.due_date == due.due_date
+        assert client.get("/api/problems/").json() == {}
+
+    def test_read_problems_unknown_type(self, client: TestClient, db_session):
+        """Test that a due problem of an unregistered type is a 404, not a server error."""
+        db_session.add(Problem(name="invalid_problem_type"))
+        db_session.commit()
+
+        response = client.get("/api/problems/")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Unknown problem type: invalid_problem_type"
+
+    def test_read_problem_session(self, client: TestClient, db_session):
+        """Test fetching a session of due problems ordered by due date."""
+        problems = [Problem(name="bytes2bits") for _ in range(4)]
+        db_session.add_all(problems)
+        db_session.commit()
+        db_session.add_all([
+            Due(problem_id=problems[0].id, due_date=datetime.now() - timedelta(days=1)),
+            Due(problem_id=problems[1].id, due_date=datetime.now() - timedelta(days=3)),
+            Due(problem_id=problems[2].id, due_date=datetime.now() + timedelta(days=3)),
+        ])
+        db_session.commit()
+
+        response = client.get("/api/problems/session", params={"limit": 5})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["due_count"] == 3
+        assert [p["id"] for p in data["problems"]] == [problems[3].id, problems[1].id, problems[0].id]
+        for problem_data in data["problems"]:
+            assert "question" in problem_data
+            assert problem_data["tags"] == []
+
+    def test_read_problem_session_tag_filter(self, client: TestClient, db_session):
+        """Test that a session can be restricted to problems with given tags."""
+        problems = [Problem(name="bytes2bits") for _ in range(3)]
+        db_session.add_all(problems)
+        db_session.commit()
+        client.post(f"/api/problems/{problems[1].id}/tags", json={"tag_name": "memory"})
+        client.post(f"/api/problems/{problems[2].id}/tags", json={"tag_name": "compute"})
+
+        response = client.get("/api/problems/session", params=[("tag", "memory"), ("tag", "compute"), ("limit", 1)])
+
+        data = response.json()
+        assert data["due_count"] == 2
+        assert [p["id"] for p in data["problems"]] == [problems[1].id]
+        assert data["problems"][0]["tags"] == ["memory"]
+
+    def test_demo_problem_with_seed_is_reproducible(self, client: TestClient, db_session):
+        """Test that the demo endpoint re-renders the same instance for the same seed."""
+        problem = Problem(name="bytes2bits")
+        db_session.add(problem)
+        db_session.commit()
+
+        first = client.get(f"/api/problems/{problem.id}/demo", params={"seed": 42}).json()
+        second = client.get(f"/api/problems/{problem.id}/demo", params={"seed": 42}).json()
+
+        assert first["seed"] == 42
+        assert first == second
+
+    def test_read_problem_explanation(self, client: TestClient, db_session):
+        """Test that the explanation is rendered on demand for a served instance."""
+        problem = Problem(name="batch_norm")
+        db_session.add(problem)
+        db_session.commit()
+
+        demo = client.get(f"/api/problems/{problem.id}/demo").json()
+        assert "solution_explanation" not in demo
+
+        response = client.get(f"/api/problems/{problem.id}/explanation", params={"seed": demo["seed"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["seed"] == demo["seed"]
+        assert "Batch Normalization" in data["solution_explanation"]
+
+    def test_read_problem_explanation_not_found(self, client: TestClient):
+        """Test explanation of a non-existent problem."""
+        response = client.get("/api/problems/999/explanation", params={"seed": 1})
+
+        assert response.status_code == 404
+
     def test_read_problem_by_id(self, client: TestClient, db_session):
         """Test reading a specific problem by ID."""
         problem = Problem(name="test_problem")
@@ -114,6 +246,107 @@ class TestReviewEndpoints:
         assert "id" in data
         assert "created_date" in data
 
+    def test_create_review_updates_scheduler_state(self, client: TestClient, db_session):
+        """Test that reviews are folded into the stored scheduler state."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.refresh(problem)
+
+        for correct in [True, True, False]:
+            client.post("/api/reviews/", json={"problem_id": problem.id, "correct": correct})
+
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == problem.id).first()
+        assert state is not None
+        assert state.review_count == 3
+        assert state.correct_streak == 0
+        assert state.recent_results == "110"
+
+        due = db_session.query(Due).filter(Due.problem_id == problem.id).first()
+        assert due.due_date == state.last_review_date + timedelta(days=1)
+
+    def test_create_review_backfills_missing_state(self, client: TestClient, db_session):
+        """Test that a problem with history but no stored state is rebuilt from its reviews."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.refresh(problem)
+        for i in range(3):
+            db_session.add(Review(problem_id=problem.id, correct=True,
+                                  created_date=datetime.now() - timedelta(days=10 - i)))
+        db_session.commit()
+
+        client.post("/api/reviews/", json={"problem_id": problem.id, "correct": True})
+
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == problem.id).first()
+        assert state.review_count == 4
+        assert state.correct_streak == 4
+
+    def test_create_reviews_bulk(self, client: TestClient, db_session):
+        """Test recording many reviews in one request with per-item results."""
+        problems = [Problem(name="test_problem"), Problem(name="test_problem")]
+        db_session.add_all(problems)
+        db_session.commit()
+        first, second = problems
+        answered_at = datetime.now() - timedelta(days=2)
+
+        response = client.post("/api/reviews/bulk", json=[
+            {"problem_id": first.id, "correct": True, "created_date": (answered_at - timedelta(hours=1)).isoformat()},
+            {"problem_id": 999, "correct": True},
+            {"problem_id": first.id, "correct": True, "created_date": answered_at.isoformat()},
+            {"problem_id": second.id, "correct": False},
+        ])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 3
+        assert data["rescheduled"] == 2
+        assert [r["created"] for r in data["results"]] == [True, False, True, True]
+        assert data["results"][1]["detail"] == "Problem not found"
+        assert data["results"][0]["review"]["problem_id"] == first.id
+
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == first.id).first()
+        assert state.review_count == 2
+        assert state.correct_streak == 2
+        due = db_session.query(Due).filter(Due.problem_id == first.id).first()
+        assert due.due_date == answered_at + timedelta(days=6)
+        assert db_session.query(Review).count() == 3
+
+    def test_create_reviews_bulk_out_of_order_rebuilds_state(self, client: TestClient, db_session):
+        """Test that reviews older than the stored state trigger a rebuild from history."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        client.post("/api/reviews/", json={"problem_id": problem.id, "correct": False})
+
+        earlier = (datetime.now() - timedelta(days=30)).isoformat()
+        client.post("/api/reviews/bulk", json=[{"problem_id": problem.id, "correct": True, "created_date": earlier}])
+
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == problem.id).first()
+        assert state.review_count == 2
+        assert state.recent_results == "10"
+        assert state.correct_streak == 0
+
+    def test_create_reviews_bulk_timezone_aware_date(self, client: TestClient, db_session):
+        """Test that aware timestamps are stored as naive UTC and compared with existing state."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        client.post("/api/reviews/", json={"problem_id": problem.id, "correct": False})
+
+        response = client.post("/api/reviews/bulk", json=[
+            {"problem_id": problem.id, "correct": True, "created_date": "2030-01-01T00:00:00Z"},
+            {"problem_id": problem.id, "correct": True, "created_date": "2030-01-01T03:00:00+02:00"},
+        ])
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+        dates = sorted(r.created_date for r in db_session.query(Review).filter(Review.created_date > datetime(2029, 1, 1)))
+        assert dates == [datetime(2030, 1, 1, 0, 0), datetime(2030, 1, 1, 1, 0)]
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == problem.id).first()
+        assert state.review_count == 3
+        assert state.last_review_date == datetime(2030, 1, 1, 1, 0)
+
     def test_create_review_problem_not_found(self, client: TestClient):
         """Test creating review for non-existent problem."""
         response = client.post("/api/reviews/", json={
@@ -172,6 +405,108 @@ class TestReviewEndpoints:
         assert isinstance(data, list)
         assert len(data) <= 2
 
+    def test_read_reviews_cursor_pagination(self, client: TestClient, db_session):
+        """Test walking the review log page by page with keyset cursors."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        base_time = datetime(2025, 1, 1)
+        # Two reviews share a timestamp so the id tiebreak matters
+        dates = [base_time, base_time + timedelta(days=1), base_time + timedelta(days=1), base_time + timedelta(days=2),
+                 base_time + timedelta(days=3)]
+        db_session.add_all([Review(problem_id=problem.id, correct=i % 2 == 0, created_date=d) for i, d in enumerate(dates)])
+        db_session.commit()
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = client.get("/api/reviews/", params=params)
+            assert response.status_code == 200
+            seen.extend(r["id"] for r in response.json())
+            if "x-next-cursor" not in response.headers:
+                break
+            params = {"limit": 2, "cursor": response.headers["x-next-cursor"]}
+
+        assert seen == sorted(seen)
+        assert len(seen) == 5
+
+    def test_read_reviews_filters(self, client: TestClient, db_session):
+        """Test filtering reviews by outcome and date range."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        base_time = datetime(2025, 1, 1)
+        db_session.add_all([
+            Review(problem_id=problem.id, correct=True, created_date=base_time),
+            Review(problem_id=problem.id, correct=False, created_date=base_time + timedelta(days=1)),
+            Review(problem_id=problem.id, correct=True, created_date=base_time + timedelta(days=2)),
+        ])
+        db_session.commit()
+
+        response = client.get("/api/reviews/", params={
+            "correct": True, "since": (base_time + timedelta(hours=1)).isoformat(),
+        })
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["created_date"].startswith("2025-01-03")
+
+    def test_read_reviews_invalid_cursor(self, client: TestClient):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/api/reviews/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_read_reviews_short_cursor(self, client: TestClient):
+        """Test that a cursor missing part of the sort key is rejected rather than truncated."""
+        response = client.get("/api/reviews/", params={"cursor": encode_cursor(datetime(2025, 1, 1))})
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json()["detail"]
+
+    def test_export_reviews_ndjson(self, client: TestClient, db_session):
+        """Test streaming the review log as NDJSON."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        base_time = datetime(2025, 1, 1)
+        db_session.add_all([
+            Review(problem_id=problem.id, correct=i % 3 != 0, created_date=base_time + timedelta(hours=i))
+            for i in range(2500)
+        ])
+        db_session.commit()
+
+        response = client.get("/api/reviews/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 2500
+        assert lines[0] == {"id": 1, "problem_id": problem.id, "created_date": "2025-01-01T00:00:00", "correct": False}
+        assert [line["id"] for line in lines] == sorted(line["id"] for line in lines)
+
+    def test_export_reviews_csv(self, client: TestClient, db_session):
+        """Test streaming a filtered review log as CSV."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        base_time = datetime(2025, 1, 1)
+        db_session.add_all([
+            Review(problem_id=problem.id, correct=True, created_date=base_time + timedelta(days=i)) for i in range(5)
+        ])
+        db_session.commit()
+
+        response = client.get("/api/reviews/export", params={
+            "format": "csv", "since": (base_time + timedelta(days=3)).isoformat(),
+        })
+
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["id", "problem_id", "created_date", "correct"]
+        assert [row[2] for row in rows[1:]] == ["2025-01-04T00:00:00", "2025-01-05T00:00:00"]
+        assert rows[1][3] == "True"
+
+    def test_export_reviews_invalid_format(self, client: TestClient):
+        """Test that unknown export formats are rejected."""
+        assert client.get("/api/reviews/export", params={"format": "xml"}).status_code == 422
+
     def test_read_problem_reviews(self, client: TestClient, db_session):
         """Test reading reviews for a specific problem."""
         # Create a problem and reviews
@@ -224,6 +559,95 @@ class TestReviewEndpoints:
         assert response.status_code == 404
 
 
+class TestProblemListing:
+    def test_list_all_problems_cursor_and_filters(self, client: TestClient, db_session):
+        """Test paging and filtering the problem listing."""
+        problems = [Problem(name=f"problem_{i}", suspended=i % 2 == 1) for i in range(5)]
+        db_session.add_all(problems)
+        db_session.commit()
+
+        first = client.get("/api/problems/all", params={"limit": 2, "suspended": False})
+        assert [p["name"] for p in first.json()] == ["problem_0", "problem_2"]
+
+        second = client.get("/api/problems/all", params={
+            "limit": 2, "suspended": False, "cursor": first.headers["x-next-cursor"],
+        })
+        assert [p["name"] for p in second.json()] == ["problem_4"]
+        assert "x-next-cursor" not in second.headers
+
+    def test_list_all_problems_tag_filter(self, client: TestClient, db_session):
+        """Test listing only problems with a given tag."""
+        problems = [Problem(name="tagged"), Problem(name="untagged")]
+        db_session.add_all(problems)
+        db_session.commit()
+        client.post(f"/api/problems/{problems[0].id}/tags", json={"tag_name": "memory"})
+
+        response = client.get("/api/problems/all", params={"tag": "memory"})
+        assert [p["name"] for p in response.json()] == ["tagged"]
+
+
+class TestQueryCounts:
+    def _seed(self, db_session, n_problems):
+        tags = db_session.query(Tag).order_by(Tag.id).all() or [Tag(name="memory"), Tag(name="compute")]
+        problems = [Problem(name="bytes2bits", tags=tags) for _ in range(n_problems)]
+        db_session.add_all(problems)
+        db_session.commit()
+        db_session.add_all([Review(problem_id=p.id, correct=True) for p in problems for _ in range(3)])
+        db_session.commit()
+        return problems
+
+    def test_list_all_problems_query_count(self, client: TestClient, db_session, query_counter):
+        """Test that listing problems with tags runs the same statements for any deck size."""
+        self._seed(db_session, 3)
+        with query_counter() as small:
+            assert len(client.get("/api/problems/all").json()) == 3
+
+        self._seed(db_session, 30)
+        with query_counter() as large:
+            response = client.get("/api/problems/all")
+        assert len(response.json()) == 33
+        assert response.json()[0]["tags"][0]["name"] == "memory"
+        assert small.count == large.count == 2
+
+    def test_read_problems_query_count(self, client: TestClient, db_session, query_counter):
+        """Test that serving the next card doesn't lazily load its tags."""
+        self._seed(db_session, 30)
+        with query_counter() as counter:
+            data = client.get("/api/problems/").json()
+        assert sorted(data["tags"]) == ["compute", "memory"]
+        # due problem with the due count, its tags
+        assert counter.count == 2
+
+    def test_read_problem_session_query_count(self, client: TestClient, db_session, query_counter):
+        """Test that a session counts its due problems in the same query that fetches them."""
+        self._seed(db_session, 30)
+        with query_counter() as counter:
+            data = client.get("/api/problems/session", params={"limit": 5}).json()
+        assert len(data["problems"]) == 5
+        assert data["due_count"] == 30
+        # due problems with the due count, their tags
+        assert counter.count == 2
+
+    def test_read_problem_query_count(self, client: TestClient, db_session, query_counter):
+        """Test that a problem's reviews are eager loaded."""
+        problem_id = self._seed(db_session, 1)[0].id
+        with query_counter() as counter:
+            data = client.get(f"/api/problems/{problem_id}").json()
+        assert len(data["reviews"]) == 3
+        # problem, reviews, tags
+        assert counter.count == 3
+
+    def test_list_suspended_problems_query_count(self, client: TestClient, db_session, query_counter):
+        """Test that suspended problems are listed without per-row queries."""
+        for problem in self._seed(db_session, 10):
+            problem.suspended = True
+        db_session.commit()
+        with query_counter() as counter:
+            response = client.get("/api/problems/suspended")
+        assert len(response.json()) == 10
+        assert counter.count == 2
+
+
 class TestAnalyticsEndpoint:
     def test_analytics_empty_database(self, client: TestClient):
         """Test analytics endpoint with empty database."""
@@ -260,6 +684,9 @@ class TestAnalyticsEndpoint:
         ]
         db_session.add_all(reviews)
         db_session.commit()
+        # Reviews written directly bypass the counters the review endpoints maintain
+        recompute_counters(db_session)
+        db_session.commit()
         
         # Create due dates
         due1 = Due(problem_id=problem1.id, due_date=datetime.now() - timedelta(days=1))
@@ -317,3 +744,140 @@ class TestStaticFileServing:
         # Should return 404 for unknown API routes
         assert response.status_code == 404
         assert "API endpoint not found" in response.json()["detail"]
+
+
+class TestMetricsEndpoint:
+    def test_request_and_sql_metrics(self, client: TestClient, db_session):
+        """Test that requests are counted per route template with their SQL work."""
+        problem = Problem(name="bytes2bits")
+        db_session.add(problem)
+        db_session.commit()
+        route = ("GET", "/api/problems/{problem_id}")
+        requests_before = http_requests.value(*route, "200")
+        statements_before = http_request_sql_statements.sum(*route)
+
+        assert client.get(f"/api/problems/{problem.id}").status_code == 200
+        assert client.get(f"/api/problems/{problem.id}").status_code == 200
+
+        assert http_requests.value(*route, "200") == requests_before + 2
+        # problem, reviews, tags on each request
+        assert http_request_sql_statements.sum(*route) == statements_before + 6
+
+    def test_transaction_control_not_counted(self, tmp_path):
+        """Test that the BEGIN emitted for SQLite write sessions isn't counted as a statement."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            with engine.execution_options(sqlite_begin="IMMEDIATE").begin() as conn:
+                conn.execute(text("SELECT 1"))
+        finally:
+            _request_stats.reset(token)
+            engine.dispose()
+
+        assert stats.sql_statements == 1
+
+    def test_generation_time_recorded(self, client: TestClient, db_session):
+        """Test that rendering a new problem instance records its generation time."""
+        problem = Problem(name="roofline")
+        db_session.add(problem)
+        db_session.commit()
+        before = problem_generation_duration.count("roofline")
+        # A seed no other test renders, so the instance cache can't serve it
+        assert client.get(f"/api/problems/{problem.id}/demo?seed=987654321").status_code == 200
+        assert problem_generation_duration.count("roofline") == before + 1
+
+    def test_prometheus_format(self, client: TestClient):
+        """Test that /api/metrics serves cumulative histogram buckets in the text format."""
+        client.get("/api/pool/stats")
+        response = client.get("/api/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        lines = response.text.splitlines()
+        assert "# TYPE http_request_duration_seconds histogram" in lines
+        buckets = [line for line in lines
+                   if line.startswith('http_request_duration_seconds_bucket{method="GET",route="/api/pool/stats"')]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+        assert buckets[-1].split(" ")[0].endswith('le="+Inf"}')
+        assert counts == sorted(counts)
+        assert f'http_request_duration_seconds_count{{method="GET",route="/api/pool/stats"}} {counts[-1]}' in lines
+
+
+class TestRequestProfiling:
+    def _client(self, tmp_path):
+        return TestClient(ProfilingMiddleware(app, directory=tmp_path, keep=2))
+
+    def test_unprofiled_request_untouched(self, tmp_path):
+        """Test that requests without the profile flag pass straight through."""
+        response = self._client(tmp_path).get("/api/pool/stats")
+        assert response.status_code == 200
+        assert "x-profile-path" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sampled_profile_stored_by_route(self, tmp_path, db_session):
+        """Test that a sampled profile is written as collapsed stacks under its route."""
+        problem = Problem(name="bytes2bits")
+        db_session.add(problem)
+        db_session.commit()
+        client = self._client(tmp_path)
+        for _ in range(10):
+            response = client.get(f"/api/problems/{problem.id}", headers={"X-Profile": "sample"})
+
+            assert response.status_code == 200
+            assert response.json()["id"] == problem.id
+            path = tmp_path / "GET_api_problems_{problem_id}" / response.headers["x-profile-path"].rsplit("/", 1)[1]
+            assert path.suffix == ".collapsed"
+            for line in path.read_text().splitlines():
+                stack, count = line.rsplit(" ", 1)
+                assert stack.startswith("read_problem (main.py:")
+                # Only the endpoint is sampled, never the profiler starting or stopping
+                assert "src/profiling.py" not in stack
+                assert int(count) > 0
+
+    def test_cprofile_inline(self, tmp_path):
+        """Test that inline output replaces the body with the cProfile report."""
+        response = self._client(tmp_path).get("/api/analytics/?profile=cprofile&profile_output=inline")
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-status"] == "200"
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "get_analytics" in response.text
+        assert response.headers["x-profile-path"].endswith(".prof")
+
+    def test_stop_without_start(self):
+        """Test that stopping a profile whose endpoint never ran is a no-op."""
+        request = ProfileRequest("sample")
+        request.stop()
+        assert request.elapsed == 0.0
+        assert request.collapsed() == ""
+
+    def test_concurrent_cprofile_falls_back_to_sampling(self):
+        """Test that a second cProfile request samples instead of clobbering the first one's profiler."""
+        first, second = ProfileRequest("cprofile"), ProfileRequest("cprofile")
+        first.start()
+        try:
+            second.start()
+            second.stop()
+        finally:
+            first.stop()
+        assert first.profile is not None
+        assert second.mode == "sample"
+        assert second.profile is None
+
+        third = ProfileRequest("cprofile")
+        third.start()
+        third.stop()
+        assert third.profile is not None
+
+    def test_default_directory_independent_of_cwd(self):
+        """Test that profiles default to the backend directory rather than the working directory."""
+        assert PROFILE_DIR.is_absolute()
+        assert PROFILE_DIR.parent == Path(__file__).resolve().parent.parent
+
+    def test_old_profiles_pruned(self, tmp_path):
+        """Test that only the newest profiles of a route are kept."""
+        client = self._client(tmp_path)
+        for _ in range(4):
+            client.get("/api/pool/stats", headers={"X-Profile": "1"})
+        assert len(list((tmp_path / "GET_api_pool_stats").iterdir())) == 2
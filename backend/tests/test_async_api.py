@@ -0,0 +1,122 @@
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from async_routes import replace_sync_routes, router  # noqa: E402
+from database import Due, Problem, SchedulerState, create_async_db_engine, get_async_db, get_async_write_db  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app as sync_app  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from tests.conftest import SQLALCHEMY_DATABASE_URL  # noqa: E402
+
+
+@pytest.fixture
+def async_engine():
+    return create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+
+
+@pytest.fixture
+def async_client(async_engine):
+    def override(bind):
+        session_factory = async_sessionmaker(bind, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with session_factory() as db:
+                yield db
+        return override_get_async_db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override(async_engine)
+    app.dependency_overrides[get_async_write_db] = override(async_engine.execution_options(sqlite_begin="IMMEDIATE"))
+    with TestClient(app) as client:
+        yield client
+
+
+class TestAsyncEndpoints:
+    def test_read_problems(self, async_client: TestClient, db_session):
+        """Test serving the next due problem through the async session."""
+        problem = Problem(name="arithmetic_intensity")
+        db_session.add(problem)
+        db_session.commit()
+        db_session.add(Due(problem_id=problem.id, due_date=datetime.now() - timedelta(days=1)))
+        db_session.commit()
+
+        data = async_client.get("/api/problems/").json()
+
+        assert data["id"] == problem.id
+        assert data["due_count"] == 1
+        assert "question" in data
+
+    def test_read_problems_empty(self, async_client: TestClient):
+        """Test that an empty deck returns an empty object."""
+        assert async_client.get("/api/problems/").json() == {}
+
+    def test_create_review(self, async_client: TestClient, db_session):
+        """Test that async reviews update scheduler state and the due date."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+
+        response = async_client.post("/api/reviews/", json={"problem_id": problem.id, "correct": True})
+
+        assert response.status_code == 200
+        assert response.json()["problem_id"] == problem.id
+        state = db_session.query(SchedulerState).filter(SchedulerState.problem_id == problem.id).first()
+        assert state.review_count == 1
+        due = db_session.query(Due).filter(Due.problem_id == problem.id).first()
+        assert due.due_date == state.last_review_date + timedelta(days=6)
+
+    def test_create_review_begins_immediate(self, async_client: TestClient, async_engine, db_session):
+        """Test that async reviews take the write lock up front, like the sync write sessions."""
+        problem = Problem(name="test_problem")
+        db_session.add(problem)
+        db_session.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async_client.post("/api/reviews/", json={"problem_id": problem.id, "correct": True})
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+        assert statements[0] == "BEGIN IMMEDIATE"
+        assert "BEGIN DEFERRED" not in statements
+
+    def test_create_review_problem_not_found(self, async_client: TestClient):
+        """Test reviewing a non-existent problem."""
+        response = async_client.post("/api/reviews/", json={"problem_id": 999, "correct": True})
+        assert response.status_code == 404
+
+    def test_analytics_etag(self, async_client: TestClient, db_session):
+        """Test async analytics with ETag revalidation."""
+        db_session.add(Problem(name="test_problem"))
+        db_session.commit()
+
+        response = async_client.get("/api/analytics/")
+        assert response.json()["summary"]["total_problems"] == 1
+
+        cached = async_client.get("/api/analytics/", headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
+
+    def test_replaces_sync_routes(self):
+        """Test that the async routes take the place of the sync ones rather than shadowing them."""
+        app = FastAPI()
+        app.router.routes.extend(sync_app.router.routes)
+        replace_sync_routes(app)
+
+        schema = app.openapi()
+        operation_ids = [operation["operationId"] for path in schema["paths"].values() for operation in path.values()]
+        assert len(operation_ids) == len(set(operation_ids))
+        replaced = {(route.path, method) for route in router.routes for method in route.methods}
+        remaining = {(route.path, method) for route in app.routes
+                     if isinstance(route, APIRoute) for method in route.methods}
+        assert not replaced & remaining
+        assert all(method.lower() in schema["paths"][path] for path, method in replaced)
@@ -0,0 +1,54 @@
+import pytest
+from database import SQLITE_PRAGMA_PROFILES, create_db_engine
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+class TestSqliteProfiles:
+    def test_production_profile_applies_pragmas(self, tmp_path):
+        """Test that the production profile's PRAGMAs are set on new connections."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'prd.db'}", "production")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        engine.dispose()
+
+    def test_default_profile_leaves_sqlite_defaults(self, tmp_path):
+        """Test that the default profile keeps rollback journal mode."""
+        assert SQLITE_PRAGMA_PROFILES["default"] == {}
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'dev.db'}")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "delete"
+        engine.dispose()
+
+
+class TestSqliteWriteTransactions:
+    def test_immediate_begin_takes_write_lock(self, tmp_path):
+        """Test that a write transaction holds the write lock before its first write."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'locks.db'}", "production")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+        writer = engine.execution_options(sqlite_begin="IMMEDIATE")
+        with writer.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("PRAGMA busy_timeout = 0"))
+            second.commit()
+            with pytest.raises(OperationalError, match="database is locked"):
+                second.execute(text("INSERT INTO t VALUES (1)"))
+            first.rollback()
+        engine.dispose()
+
+    def test_default_begin_is_deferred(self, tmp_path):
+        """Test that read sessions don't take the write lock."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'locks.db'}", "production")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+        with engine.connect() as reader, engine.begin() as writer:
+            reader.execute(text("SELECT * FROM t")).all()
+            writer.execute(text("INSERT INTO t VALUES (1)"))
+        engine.dispose()
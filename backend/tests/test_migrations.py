@@ -0,0 +1,117 @@
+import pytest
+from database import count_queries, create_db_engine
+from migrations import LATEST_VERSION, run_migrations
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.analytics.counters import check_counters
+
+# Schema as created by the app before suspension, tags and the due queue existed
+LEGACY_SCHEMA = [
+    "CREATE TABLE problems (id INTEGER PRIMARY KEY, created_date DATETIME, name VARCHAR)",
+    "CREATE TABLE reviews (id INTEGER PRIMARY KEY, problem_id INTEGER, created_date DATETIME, correct BOOLEAN)",
+    "CREATE TABLE due (id INTEGER PRIMARY KEY, problem_id INTEGER, due_date DATETIME)",
+    "CREATE TABLE tags (id INTEGER PRIMARY KEY, name VARCHAR, UNIQUE(name))",
+    "CREATE TABLE problem_tags (id INTEGER PRIMARY KEY, problem_id INTEGER, tag_id INTEGER)",
+]
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("INSERT INTO problems (id, name) VALUES (1, 'bytes2bits')")
+        conn.exec_driver_sql("INSERT INTO reviews (problem_id, created_date, correct) VALUES (1, '2025-01-01 00:00:00', 0)")
+        conn.exec_driver_sql("INSERT INTO reviews (problem_id, created_date, correct) VALUES (1, '2025-01-02 00:00:00', 1)")
+        conn.exec_driver_sql("INSERT INTO due (problem_id, due_date) VALUES (1, '2025-01-01 00:00:00')")
+        conn.exec_driver_sql("INSERT INTO due (problem_id, due_date) VALUES (1, '2025-02-01 00:00:00')")
+        conn.exec_driver_sql("INSERT INTO tags (id, name) VALUES (1, 'memory')")
+        conn.exec_driver_sql("INSERT INTO problem_tags (problem_id, tag_id) VALUES (1, 1)")
+        conn.exec_driver_sql("INSERT INTO problem_tags (problem_id, tag_id) VALUES (1, 1)")
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    def test_fresh_database_created_at_latest_version(self, tmp_path):
+        """Test that a new database is built from the models and stamped with the latest version."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        assert run_migrations(engine) == 0
+
+        inspector = inspect(engine)
+        assert "scheduler_state" in inspector.get_table_names()
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT MAX(version) FROM schema_version").scalar() == LATEST_VERSION
+        engine.dispose()
+
+    def test_legacy_database_upgraded(self, legacy_engine):
+        """Test that a pre-versioning database gets every migration applied."""
+        assert run_migrations(legacy_engine) == LATEST_VERSION
+
+        inspector = inspect(legacy_engine)
+        problem_columns = {column["name"] for column in inspector.get_columns("problems")}
+        assert {"suspended", "suspend_reason", "due_date"} <= problem_columns
+        assert "scheduler_state" in inspector.get_table_names()
+        review_indexes = {index["name"] for index in inspector.get_indexes("reviews")}
+        assert {"ix_reviews_created_date_id", "ix_reviews_problem_id_created_date"} <= review_indexes
+
+        with legacy_engine.connect() as conn:
+            # Duplicates were collapsed and the mirrored due date backfilled
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM due").scalar() == 1
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM problem_tags").scalar() == 1
+            assert conn.exec_driver_sql("SELECT due_date FROM problems").scalar().startswith("2025-02-01")
+            # Counters backfilled from the review log
+            counters = conn.exec_driver_sql(
+                "SELECT total_reviews, correct_reviews, current_streak, last_reviewed_at FROM problems"
+            ).one()
+            assert tuple(counters[:3]) == (2, 1, 1)
+            assert counters[3].startswith("2025-01-02")
+
+    def test_counter_backfill_matches_review_log(self, legacy_engine):
+        """Test that the migration's own backfill agrees with the app's counter check."""
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO problems (id, name) VALUES (2, 'roofline'), (3, 'roofline')")
+            for day, correct in enumerate([1, 1, 0, 1, 1, 1], start=1):
+                conn.exec_driver_sql(
+                    "INSERT INTO reviews (problem_id, created_date, correct) VALUES (2, ?, ?)",
+                    (f"2025-01-0{day} 00:00:00", correct),
+                )
+        run_migrations(legacy_engine)
+
+        with Session(legacy_engine) as db:
+            assert check_counters(db) == []
+
+    def test_due_date_mirror_matches_kept_due_row(self, legacy_engine):
+        """Test that the mirrored due date comes from the due row kept by deduplication."""
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO problems (id, name) VALUES (2, 'roofline')")
+            # The newest row by id holds the earlier date
+            conn.exec_driver_sql("INSERT INTO due (id, problem_id, due_date) VALUES (10, 2, '2025-03-01 00:00:00')")
+            conn.exec_driver_sql("INSERT INTO due (id, problem_id, due_date) VALUES (11, 2, '2025-01-15 00:00:00')")
+        run_migrations(legacy_engine)
+
+        with legacy_engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT problems.due_date, due.due_date FROM problems JOIN due ON due.problem_id = problems.id"
+            ).all()
+            assert len(rows) == 2
+            assert all(mirror == due_date for mirror, due_date in rows)
+            assert conn.exec_driver_sql("SELECT due_date FROM problems WHERE id = 2").scalar().startswith("2025-01-15")
+
+    def test_unique_constraints_enforced(self, legacy_engine):
+        """Test that duplicate due rows and tag links are rejected after migrating."""
+        run_migrations(legacy_engine)
+        with pytest.raises(IntegrityError), legacy_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO problem_tags (problem_id, tag_id) VALUES (1, 1)")
+        with pytest.raises(IntegrityError), legacy_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO due (problem_id, due_date) VALUES (1, '2025-03-01 00:00:00')")
+
+    def test_up_to_date_only_checks_version(self, legacy_engine):
+        """Test that startup on an up to date database only checks the version."""
+        run_migrations(legacy_engine)
+        with count_queries(legacy_engine) as counter:
+            assert run_migrations(legacy_engine) == 0
+        # schema_version exists, and its version
+        assert counter.count == 2
@@ -1,9 +1,15 @@
+import asyncio
 import pytest
+import time
 from src.problems.arithmetic_intensity import ArithmeticIntensity
+from src.problems.bank import ProblemBank, build_bank, close_bank, open_bank
 from src.problems.bytes2bits import Bytes2Bits
-from src.problems.dispatch import dispatch_problem
+from src.problems.dispatch import _render_problem, dispatch_problem, explain_problem
+from src.problems.executor import GenerationExecutor, completed
+from src.problems.pool import ProblemPool
 from src.problems.ram_bandwidth import RamBandwidth
 from src.problems.rec_sys_matrix_fact import RecSysMatrixFact
+from src.problems.registry import UnknownProblemError, get_generator, get_spec, list_problems, register_problem
 from src.problems.roofline import Roofline
 
 
@@ -159,5 +165,259 @@ class TestProblemDispatch:
 
     def test_dispatch_invalid_problem_type(self):
         """Test that invalid problem types raise appropriate errors."""
-        with pytest.raises(ValueError):
+        with pytest.raises(ValueError, match="Unknown problem type: invalid_problem_type"):
             dispatch_problem("invalid_problem_type")
+
+
+
+class TestSeededGeneration:
+    def test_same_seed_same_instance(self):
+        """Test that every generator renders identically for the same seed."""
+        for spec in list_problems():
+            generator = get_generator(spec.name)
+            first = generator.generate_problem(seed=1234)
+            second = generator.generate_problem(seed=1234)
+
+            assert first["seed"] == 1234
+            assert first == second
+
+    def test_seed_returned_when_not_given(self):
+        """Test that an unseeded instance reports the seed it can be regenerated from."""
+        result = Bytes2Bits().generate_problem()
+
+        assert Bytes2Bits().generate_problem(seed=result["seed"]) == result
+
+    def test_dispatch_cache_hit(self):
+        """Test that dispatching the same (name, seed) twice is served from the cache."""
+        _render_problem.cache_clear()
+        first = dispatch_problem("roofline", seed=7)
+        first["id"] = 1
+        second = dispatch_problem("roofline", seed=7)
+
+        assert _render_problem.cache_info().hits == 1
+        assert "id" not in second
+        assert second["question"] == first["question"]
+
+    def test_unseeded_dispatch_bypasses_cache(self):
+        """Test that fresh random seeds don't evict the cached (name, seed) instances."""
+        _render_problem.cache_clear()
+        dispatch_problem("roofline", seed=7)
+        for _ in range(5):
+            assert "question" in dispatch_problem("roofline")
+
+        assert _render_problem.cache_info().currsize == 1
+
+    def test_explanation_is_deferred(self):
+        """Test that explanations are only rendered on request and match the seeded instance."""
+        for spec in list_problems():
+            generator = get_generator(spec.name)
+            problem = generator.generate_problem(seed=99)
+            explained = generator.generate_problem(seed=99, explain=True)
+
+            assert "solution_explanation" not in problem
+            assert explained.pop("solution_explanation") == explain_problem(spec.name, 99)
+            assert explained == problem
+
+class TestProblemRegistry:
+    def test_generators_are_singletons(self):
+        """Test that repeated lookups return the same generator instance."""
+        generator = get_generator("bytes2bits")
+
+        assert isinstance(generator, Bytes2Bits)
+        assert get_generator("bytes2bits") is generator
+
+    def test_every_registered_type_generates(self):
+        """Test that every registry entry resolves to a working generator."""
+        for spec in list_problems():
+            result = dispatch_problem(spec.name)
+            assert "question" in result
+
+    def test_spec_metadata(self):
+        """Test that registry entries carry their metadata."""
+        spec = get_spec("rec_sys_matrix_fact")
+
+        assert spec.cost == "heavy"
+        assert "ml" in spec.tags
+
+    def test_unknown_type_raises(self):
+        """Test that looking up an unregistered type raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown problem type: invalid_problem_type"):
+            get_spec("invalid_problem_type")
+
+    def test_duplicate_registration_raises(self):
+        """Test that a name cannot be registered twice."""
+        with pytest.raises(ValueError, match="already registered: bytes2bits"):
+            register_problem("bytes2bits", ".bytes2bits", "Bytes2Bits")
+
+
+class TestProblemPool:
+    def test_miss_generates_inline(self):
+        """Test that an empty pool falls back to generating synchronously."""
+        pool = ProblemPool(low_watermark=1, high_watermark=3)
+        result = pool.get("bytes2bits")
+
+        assert "question" in result
+        assert pool.stats()["misses"] == 1
+        assert pool.stats()["hits"] == 0
+
+    def test_refill_serves_hits(self):
+        """Test that refilled instances are served as hits and topped up to the high watermark."""
+        pool = ProblemPool(low_watermark=1, high_watermark=3)
+        pool.warm(["bytes2bits"])
+        pool.refill()
+        assert pool.stats()["sizes"]["bytes2bits"] == 3
+
+        for _ in range(3):
+            assert "question" in pool.get("bytes2bits")
+
+        stats = pool.stats()
+        assert stats["hits"] == 3
+        assert stats["refills"] == 1
+        assert stats["sizes"]["bytes2bits"] == 0
+
+    def test_unknown_problem_type_rejected(self):
+        """Test that a name missing from the registry is rejected rather than pooled."""
+        pool = ProblemPool(low_watermark=1, high_watermark=2)
+
+        with pytest.raises(UnknownProblemError, match="invalid_problem_type"):
+            pool.get("invalid_problem_type")
+        assert "invalid_problem_type" not in pool.stats()["sizes"]
+
+    def test_refill_drops_unknown_problem_types(self):
+        """Test that problem types whose generator fails are removed from the pool."""
+        pool = ProblemPool(low_watermark=1, high_watermark=2)
+        pool.warm(["invalid_problem_type"])
+        pool.refill()
+
+        assert "invalid_problem_type" not in pool.stats()["sizes"]
+
+    def test_background_thread_refills(self):
+        """Test that taking from a pool below its low watermark wakes the refill thread."""
+        pool = ProblemPool(low_watermark=2, high_watermark=4)
+        pool.start()
+        try:
+            pool.get("bytes2bits")
+            for _ in range(100):
+                if pool.stats()["sizes"]["bytes2bits"] == 4:
+                    break
+                time.sleep(0.01)
+            assert pool.stats()["sizes"]["bytes2bits"] == 4
+        finally:
+            pool.stop()
+
+
+    def test_get_many_generates_misses_together(self):
+        """Test that a batch's misses go to generate_many in one call, failures kept per item."""
+        calls = []
+
+        def generate_many(names):
+            calls.append(names)
+            return [completed(dispatch_problem, name) for name in names]
+
+        pool = ProblemPool(low_watermark=1, high_watermark=2, generate_many=generate_many)
+        pool.warm(["bytes2bits"])
+        pool.refill()
+        futures = pool.get_many(["bytes2bits", "roofline", "invalid_problem_type"])
+
+        assert calls == [["roofline"]]
+        assert "question" in futures[0].result()
+        assert "question" in futures[1].result()
+        with pytest.raises(UnknownProblemError, match="invalid_problem_type"):
+            futures[2].result()
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["misses"] == 1
+
+    def test_async_miss_uses_agenerate(self):
+        """Test that an async miss is served by the async generator."""
+        calls = []
+
+        async def agenerate(name):
+            calls.append(name)
+            return {"question": name}
+
+        pool = ProblemPool(low_watermark=1, high_watermark=2, agenerate=agenerate)
+        result = asyncio.run(pool.aget("bytes2bits"))
+
+        assert result == {"question": "bytes2bits"}
+        assert calls == ["bytes2bits"]
+        assert pool.stats()["misses"] == 1
+
+
+class TestGenerationExecutor:
+    def test_stopped_executor_generates_inline(self):
+        """Test that without worker processes every type is generated in the calling thread."""
+        executor = GenerationExecutor(workers=0)
+        executor.start()
+
+        assert not executor.uses_processes("rec_sys_matrix_fact")
+        assert "question" in executor.generate("rec_sys_matrix_fact")
+        assert "question" in asyncio.run(executor.agenerate("bytes2bits"))
+
+    @pytest.mark.slow
+    def test_heavy_types_run_in_processes(self):
+        """Test that only the selected cost classes are sent to the worker processes."""
+        executor = GenerationExecutor(workers=1, cost_classes=("heavy",))
+        executor.start()
+        try:
+            assert executor.uses_processes("batch_norm")
+            assert not executor.uses_processes("bytes2bits")
+            assert "question" in executor.generate("batch_norm")
+            assert "question" in asyncio.run(executor.agenerate("rec_sys_matrix_fact"))
+            futures = executor.generate_many(["batch_norm", "rec_sys_matrix_fact", "bytes2bits"])
+            assert all("question" in future.result() for future in futures)
+        finally:
+            executor.stop()
+
+class TestProblemBank:
+    def test_build_and_read(self, tmp_path):
+        """Test that a built bank serves the instances it was rendered from."""
+        path = tmp_path / "bank.bin"
+        counts = build_bank(path, ["ram_bandwidth", "roofline"], per_type=50)
+        bank = ProblemBank(path)
+        try:
+            # 6 widths x 3 clock frequencies
+            assert counts == {"ram_bandwidth": 18, "roofline": 50}
+            assert bank.count("ram_bandwidth") == 18
+            assert "bytes2bits" not in bank
+
+            entry = bank.get("roofline", 3)
+            assert entry == get_generator("roofline").generate_problem(seed=entry["seed"])
+            assert "question" in bank.sample("ram_bandwidth")
+        finally:
+            bank.close()
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that a file without the bank header is rejected."""
+        path = tmp_path / "bank.bin"
+        path.write_bytes(b"not a bank, just some bytes")
+
+        with pytest.raises(ValueError, match="is not a problem bank"):
+            ProblemBank(path)
+
+    def test_empty_type_treated_as_absent(self, tmp_path):
+        """Test that a type banked with no entries is generated instead of sampled."""
+        path = tmp_path / "bank.bin"
+        assert build_bank(path, ["bytes2bits"], max_seeds=0) == {"bytes2bits": 0}
+        bank = open_bank(path)
+        try:
+            assert "bytes2bits" not in bank
+            assert "question" in dispatch_problem("bytes2bits")
+        finally:
+            close_bank()
+
+    def test_dispatch_serves_from_open_bank(self, tmp_path):
+        """Test that unseeded dispatches come from the open bank and seeded ones do not."""
+        path = tmp_path / "bank.bin"
+        build_bank(path, ["bytes2bits"], per_type=1)
+        bank = open_bank(path)
+        try:
+            banked = bank.get("bytes2bits", 0)
+            assert dispatch_problem("bytes2bits") == banked
+            assert dispatch_problem("bytes2bits", seed=banked["seed"] + 1)["seed"] == banked["seed"] + 1
+            assert "question" in dispatch_problem("roofline")
+        finally:
+            close_bank()
+
+    def test_open_missing_bank(self, tmp_path):
+        """Test that a missing bank file is skipped rather than failing startup."""
+        assert open_bank(tmp_path / "missing.bin") is None
@@ -1,4 +1,6 @@
+import numpy as np
 import pytest
+import random
 from database import Review
 from datetime import datetime, timedelta
 from src.scheduling.dispatch import dispatch_scheduler
@@ -205,6 +207,42 @@ class TestSpacedRepetitionScheduler:
         assert interval <= 365
 
 
+class TestBatchScheduler:
+    def test_batch_matches_per_problem(self):
+        """Test that the vectorized batch gives the same dates as the per-problem scheduler."""
+        scheduler = SpacedRepetitionScheduler()
+        rng = random.Random(0)
+        base_time = datetime(2025, 1, 1)
+
+        reviews = []
+        for problem_id in range(1, 60):
+            for i in range(rng.randint(1, 25)):
+                reviews.append(Review(
+                    problem_id=problem_id,
+                    created_date=base_time + timedelta(days=rng.randint(0, 200), seconds=i),
+                    correct=rng.random() < 0.8,
+                ))
+        rng.shuffle(reviews)
+
+        problem_ids, next_dates = scheduler.get_next_review_dates_batch(
+            np.array([r.problem_id for r in reviews]),
+            np.array([r.created_date for r in reviews], dtype="datetime64[us]"),
+            np.array([r.correct for r in reviews]),
+        )
+
+        for problem_id, next_date in zip(problem_ids, next_dates):
+            expected = scheduler.get_next_review_date([r for r in reviews if r.problem_id == problem_id])
+            assert next_date.astype(datetime) == expected
+
+    def test_batch_empty(self):
+        """Test that an empty review log gives empty results."""
+        problem_ids, next_dates = SpacedRepetitionScheduler().get_next_review_dates_batch(
+            np.array([], dtype=int), np.array([], dtype="datetime64[us]"), np.array([], dtype=bool)
+        )
+        assert len(problem_ids) == 0
+        assert len(next_dates) == 0
+
+
 class TestSchedulerDispatch:
     def test_dispatch_simple_scheduler(self):
         """Test dispatching simple scheduler."""
@@ -220,3 +258,36 @@ class TestSchedulerDispatch:
         """Test that invalid scheduler names raise errors."""
         with pytest.raises(ValueError):
             dispatch_scheduler("invalid_scheduler")
+
+
+class TestIncrementalSchedulerState:
+    def _reviews(self, outcomes):
+        base_time = datetime.now() - timedelta(days=len(outcomes))
+        return [
+            Review(id=i + 1, problem_id=1, created_date=base_time + timedelta(days=i), correct=correct)
+            for i, correct in enumerate(outcomes)
+        ]
+
+    @pytest.mark.parametrize("scheduler_cls", [SimpleScheduler, SpacedRepetitionScheduler])
+    def test_incremental_matches_full_replay(self, scheduler_cls):
+        """Test that folding reviews one at a time gives the same date as replaying history."""
+        scheduler = scheduler_cls()
+        outcomes = [True, True, False, True, True, True, False, True] + [True] * 12
+        reviews = self._reviews(outcomes)
+
+        state = scheduler.new_state(1)
+        for i, review in enumerate(reviews):
+            incremental = scheduler.apply_review(state, review)
+            assert incremental == scheduler.get_next_review_date(list(reviews[: i + 1]))
+
+    def test_state_tracks_recent_window(self):
+        """Test that only the most recent outcomes are kept on the state."""
+        scheduler = SpacedRepetitionScheduler()
+        state = scheduler.new_state(1)
+        for review in self._reviews([False] * 5 + [True] * 10):
+            scheduler.apply_review(state, review)
+
+        assert state.recent_results == "1" * scheduler.recent_window
+        assert state.correct_streak == 10
+        assert state.review_count == 15
+        assert state.ease_factor == scheduler.max_ease_factor
@@ -1,4 +1,7 @@
 import numpy as np
+import pytest
+import random
+from src.problems.registry import get_generator, list_problems
 from src.problems.utils.latex import matrix_to_latex
 from src.problems.utils.options import generate_options
 
@@ -101,6 +104,43 @@ class TestOptionsGeneration:
             assert -2.0 <= value <= 2.0  # Reasonable range for 0.05 with variation
 
 
+    def test_generate_options_narrow_range_terminates(self):
+        """Test that a range too narrow for enough distinct options is widened, not retried."""
+        for answer in [0, 1, 0.5, 7.25, "x"]:
+            options, correct_index = generate_options(answer, num_options=12, variation_range=0)
+
+            assert len(options) == 12
+            assert len(set(options)) == 12
+            assert options[correct_index] == str(answer)
+
+    def test_generate_options_seeded(self):
+        """Test that options are reproducible from a seeded generator."""
+        assert generate_options(3.14, rng=random.Random(5)) == generate_options(3.14, rng=random.Random(5))
+
+    def test_generate_options_custom_strategy(self):
+        """Test that a per-type strategy supplies the wrong answers."""
+        def strategy(answer, count, rng, variation_range):
+            return ["yes", "no", "maybe"][:count]
+
+        options, correct_index = generate_options("unsure", strategy=strategy)
+
+        assert sorted(options) == ["maybe", "no", "unsure", "yes"]
+        assert options[correct_index] == "unsure"
+
+    def test_generate_options_strategy_too_few(self):
+        """Test that a strategy returning too few distinct answers raises."""
+        with pytest.raises(ValueError, match="need 3"):
+            generate_options(1, strategy=lambda answer, count, rng, variation_range: ["2", "2", "1"])
+
+    def test_all_generators_worst_case(self):
+        """Test that every generator produces unique options across many seeds."""
+        for spec in list_problems():
+            generator = get_generator(spec.name)
+            for seed in range(300):
+                problem = generator.generate_problem(seed=seed)
+                assert len(problem["options"]) == 4
+                assert len(set(problem["options"])) == 4
+
 class TestStringTemplating:
     def test_string_templating_basic(self):
         """Test basic string templating functionality."""
@@ -18,6 +18,7 @@ interface DemoProblem {
   question: string;
   options: string[];
   correct: number;
+  seed: number;
   solution_explanation?: string;
 }
 
@@ -74,6 +75,10 @@ function Browse() {
     const res = await api.get(`/api/problems/${p.id}/demo`);
     setDemo(res.data);
     setDemoOpen(true);
+    const explanation = await api.get(`/api/problems/${p.id}/explanation`, {
+      params: { seed: res.data.seed },
+    });
+    setDemo({ ...res.data, solution_explanation: explanation.data.solution_explanation });
   };
   const closeDemo = () => {
     setDemoOpen(false);
@@ -8,7 +8,7 @@ interface Problem {
   question: string;
   options: string[];
   correct: number;
-  solution_explanation?: string;
+  seed: number;
   tags?: string[];
 }
 
@@ -21,6 +21,7 @@ function Practice() {
   const [noDue, setNoDue] = useState(false);
   const [suspendOpen, setSuspendOpen] = useState(false);
   const [suspendReason, setSuspendReason] = useState("");
+  const [explanation, setExplanation] = useState<string | null>(null);
 
   const getQuestion = async () => {
     try {
@@ -44,6 +45,17 @@ function Practice() {
     }
   };
 
+  const getExplanation = async (problem: Problem) => {
+    try {
+      const response = await api.get(`/api/problems/${problem.id}/explanation`, {
+        params: { seed: problem.seed },
+      });
+      setExplanation(response.data.solution_explanation);
+    } catch (e) {
+      setExplanation(null);
+    }
+  };
+
   const addReview = async (isCorrect: boolean) => {
     const response = await api.post("/api/reviews/", {
       problem_id: currentProblem?.id,
@@ -65,12 +77,16 @@ function Practice() {
 
     setProblemsAttempted(problemsAttempted + 1);
     setShowResult(true);
+    if (currentProblem) {
+      getExplanation(currentProblem);
+    }
   };
 
   const nextProblem = () => {
     getQuestion();
     setSelectedAnswer(-1);
     setShowResult(false);
+    setExplanation(null);
   };
 
   const openSuspend = () => {
@@ -141,10 +157,10 @@ function Practice() {
                         currentProblem.options[currentProblem.correct]}
                   </Typography>
                   
-                  {currentProblem.solution_explanation && (
+                  {explanation && (
                     <Box sx={{ mt: 2 }}>
                       <MarkdownMathRenderer
-                        content={currentProblem.solution_explanation}
+                        content={explanation}
                       />
                     </Box>
                   )}